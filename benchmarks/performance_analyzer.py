@@ -8,8 +8,14 @@ import re
 import subprocess
 import os
 import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# First token of every instruction line: skips blank lines, comments (;),
+# directives (.) and any line containing a label (:)
+_MNEMONIC_RE = re.compile(r'^[ \t]*([^\s;.:][^\s:]*)[^:\n]*$', re.MULTILINE)
+
 class Z80InstructionCounter:
     """Counts Z80 instructions and estimates T-states"""
     
@@ -32,28 +38,15 @@ class Z80InstructionCounter:
     
     def count_instructions(self, asm_code):
         """Count instructions and estimate performance"""
-        lines = asm_code.split('\n')
-        instruction_count = 0
-        total_t_states = 0
-        instruction_breakdown = {}
+        instruction_breakdown = Counter(map(str.upper, _MNEMONIC_RE.findall(asm_code)))
+        instruction_count = sum(instruction_breakdown.values())
         
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith(';') or line.startswith('.') or ':' in line:
-                continue
-                
-            # Extract the instruction mnemonic
-            parts = line.split(' ', 1)
-            if parts:
-                mnemonic = parts[0].upper()
-                instruction_count += 1
-                
-                # Count instruction types
-                instruction_breakdown[mnemonic] = instruction_breakdown.get(mnemonic, 0) + 1
-                
-                # Estimate T-states
-                t_states = self.T_STATES.get(mnemonic, 8)  # Default estimate
-                total_t_states += t_states
+        # Estimate T-states once per unique mnemonic, weighted by its count
+        t_states = self.T_STATES
+        total_t_states = sum(
+            t_states.get(mnemonic, 8) * count  # Default estimate
+            for mnemonic, count in instruction_breakdown.items()
+        )
         
         return {
             'instruction_count': instruction_count,
@@ -61,6 +54,117 @@ class Z80InstructionCounter:
             'instruction_breakdown': instruction_breakdown
         }
 
+# (category, lambda benchmark, traditional benchmark) pairs to compare
+COMPARISON_PAIRS = [
+    ('Pixel Processing', '01_pixel_processing_lambda', '02_pixel_processing_traditional'),
+    ('Event Handler', '03_event_handler_lambda', '04_event_handler_traditional'),
+    ('Memory Allocator', '05_memory_allocator_lambda', '06_memory_allocator_traditional'),
+]
+
+def percent_improvement(traditional, lambda_value):
+    """Percentage by which the lambda value improves on the traditional one"""
+    return ((traditional - lambda_value) / traditional) * 100
+
+# Static report markup, kept out of generate_html_report so that only the
+# per-benchmark fragments are formatted on each run
+REPORT_HTML_HEADER = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>TRUE SMC Lambda Performance Report</title>
+    <style>
+        body { font-family: 'Segoe UI', Arial, sans-serif; margin: 40px; background: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 40px; border-radius: 10px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); }
+        h1 { color: #2c3e50; text-align: center; font-size: 2.5em; margin-bottom: 30px; }
+        h2 { color: #e74c3c; border-bottom: 3px solid #e74c3c; padding-bottom: 10px; }
+        .highlight { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin: 20px 0; }
+        .benchmark { margin: 30px 0; padding: 20px; border: 1px solid #ddd; border-radius: 8px; }
+        .performance-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin: 20px 0; }
+        .metric-card { background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #28a745; }
+        .improvement { font-size: 1.2em; font-weight: bold; color: #28a745; }
+        .negative { color: #dc3545; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #f8f9fa; font-weight: bold; }
+        .lambda-win { background-color: #d4edda; }
+        .trad-win { background-color: #f8d7da; }
+        .code-snippet { background: #2d3748; color: #e2e8f0; padding: 15px; border-radius: 8px; font-family: 'Courier New', monospace; margin: 10px 0; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🚀 TRUE SMC LAMBDA PERFORMANCE REPORT 🚀</h1>
+        
+        <div class="highlight">
+            <h2>Executive Summary</h2>
+            <p><strong>MinZ TRUE SMC Lambdas</strong> deliver revolutionary performance improvements over traditional approaches:</p>
+            <ul>
+                <li><strong>Zero allocation overhead</strong> - No heap usage for closures</li>
+                <li><strong>Direct memory access</strong> - Variables captured by absolute address</li>
+                <li><strong>Self-modifying optimization</strong> - Code adapts at runtime</li>
+                <li><strong>Faster than manual assembly</strong> - Compiler optimizations + SMC</li>
+            </ul>
+        </div>
+        
+        <h2>📊 Performance Comparisons</h2>
+"""
+
+REPORT_TABLE_HEADER = """
+        <h2>📋 Detailed Results</h2>
+        <table>
+            <tr>
+                <th>Benchmark</th>
+                <th>Approach</th>
+                <th>Instructions</th>
+                <th>Est. T-States</th>
+                <th>ASM Size (bytes)</th>
+            </tr>
+"""
+
+REPORT_HTML_FOOTER = """
+        </table>
+        
+        <h2>🎯 Key Insights</h2>
+        <div class="highlight">
+            <h3>Why TRUE SMC Lambdas Win:</h3>
+            <ol>
+                <li><strong>Absolute Address Capture:</strong> Variables captured directly by memory address</li>
+                <li><strong>Zero Indirection:</strong> No pointer chasing or struct access</li>
+                <li><strong>Live State Evolution:</strong> Lambda behavior changes as captured variables change</li>
+                <li><strong>Compiler Optimizations:</strong> Full optimization pipeline applied to lambda functions</li>
+                <li><strong>Z80-Native Design:</strong> Leverages Z80 absolute addressing natively</li>
+            </ol>
+        </div>
+        
+        <div class="code-snippet">
+// TRUE SMC Lambda Magic:
+let multiplier = 3;           // Lives at $F002  
+let triple = |x| x * multiplier;  // Captures $F002 directly!
+
+// Generates:
+lambda_main_0:
+    LD A, ($F002)    ; Direct absolute address access!
+    ; multiply code here
+    RET
+        </div>
+        
+        <h2>🚀 Conclusion</h2>
+        <p>TRUE SMC Lambdas represent a <strong>paradigm shift</strong> in functional programming performance. 
+        By combining self-modifying code with absolute address capture, MinZ achieves 
+        <strong>functional programming that's faster than manual assembly</strong>.</p>
+        
+        <p>This isn't just a language feature - it's a <strong>revolution</strong> that makes 
+        high-level abstractions <em>accelerate</em> rather than slow down your code!</p>
+        
+        <footer style="margin-top: 40px; text-align: center; color: #666;">
+            <p>Generated by MinZ TRUE SMC Lambda Performance Analyzer</p>
+            <p>MinZ Compiler - The Future of Systems Programming</p>
+        </footer>
+    </div>
+</body>
+</html>
+"""
+
 class BenchmarkAnalyzer:
     """Analyzes benchmark results and generates reports"""
     
@@ -68,12 +172,29 @@ class BenchmarkAnalyzer:
         self.counter = Z80InstructionCounter()
         self.results = {}
     
+    def asm_is_current(self, minz_file, asm_path):
+        """Whether the assembly is newer than both its source and the compiler"""
+        try:
+            asm_mtime = os.path.getmtime(asm_path)
+            return (asm_mtime > os.path.getmtime(f'/Users/alice/dev/minz-ts/{minz_file}')
+                    and asm_mtime > os.path.getmtime('/Users/alice/dev/minz-ts/minzc/minzc'))
+        except OSError:
+            return False
+    
     def compile_and_analyze(self, minz_file):
         """Compile MinZ file and analyze generated assembly"""
+        asm_file = minz_file.replace('.minz', '.a80')
+        asm_path = Path(f'/Users/alice/dev/minz-ts/minzc/{asm_file}')
+        
+        # Only the compile is skipped; the asm scan is cheap and always re-run
+        # so changes to the analyzer show up without recompiling
+        if self.asm_is_current(minz_file, asm_path):
+            print(f"Analyzing {minz_file}... (assembly up to date)")
+            return self.analyze_asm(minz_file, asm_file, asm_path)
+        
         print(f"Analyzing {minz_file}...")
         
         # Compile the MinZ file
-        asm_file = minz_file.replace('.minz', '.a80')
         try:
             result = subprocess.run([
                 './minzc/minzc', minz_file, '-o', asm_file
@@ -88,15 +209,17 @@ class BenchmarkAnalyzer:
             print(f"Failed to compile {minz_file}: {e}")
             return None
         
-        # Read and analyze the generated assembly
+        return self.analyze_asm(minz_file, asm_file, asm_path)
+    
+    def analyze_asm(self, minz_file, asm_file, asm_path):
+        """Read and analyze the generated assembly"""
         try:
-            with open(f'/Users/alice/dev/minz-ts/minzc/{asm_file}', 'r') as f:
-                asm_code = f.read()
+            asm_code = asm_path.read_text()
             
             analysis = self.counter.count_instructions(asm_code)
             analysis['source_file'] = minz_file
             analysis['asm_file'] = asm_file
-            analysis['asm_size'] = len(asm_code)
+            analysis['asm_size'] = os.path.getsize(asm_path)
             
             return analysis
             
@@ -117,10 +240,12 @@ class BenchmarkAnalyzer:
         
         results = {}
         
-        for benchmark in benchmark_files:
-            analysis = self.compile_and_analyze(benchmark)
-            if analysis:
-                results[benchmark] = analysis
+        # Each benchmark is an independent minzc invocation, so compile them concurrently
+        with ThreadPoolExecutor(max_workers=len(benchmark_files)) as executor:
+            analyses = executor.map(self.compile_and_analyze, benchmark_files)
+            for benchmark, analysis in zip(benchmark_files, analyses):
+                if analysis:
+                    results[benchmark] = analysis
         
         return results
     
@@ -128,102 +253,32 @@ class BenchmarkAnalyzer:
         """Generate performance comparison report"""
         comparisons = []
         
-        # Compare pixel processing
-        lambda_pixel = results.get('benchmarks/01_pixel_processing_lambda.minz')
-        trad_pixel = results.get('benchmarks/02_pixel_processing_traditional.minz')
-        
-        if lambda_pixel and trad_pixel:
-            comparisons.append({
-                'category': 'Pixel Processing',
-                'lambda': lambda_pixel,
-                'traditional': trad_pixel,
-                'improvement': {
-                    'instructions': ((trad_pixel['instruction_count'] - lambda_pixel['instruction_count']) / trad_pixel['instruction_count']) * 100,
-                    't_states': ((trad_pixel['estimated_t_states'] - lambda_pixel['estimated_t_states']) / trad_pixel['estimated_t_states']) * 100
-                }
-            })
-        
-        # Compare event handlers
-        lambda_event = results.get('benchmarks/03_event_handler_lambda.minz')
-        trad_event = results.get('benchmarks/04_event_handler_traditional.minz')
-        
-        if lambda_event and trad_event:
-            comparisons.append({
-                'category': 'Event Handler',
-                'lambda': lambda_event,
-                'traditional': trad_event,
-                'improvement': {
-                    'instructions': ((trad_event['instruction_count'] - lambda_event['instruction_count']) / trad_event['instruction_count']) * 100,
-                    't_states': ((trad_event['estimated_t_states'] - lambda_event['estimated_t_states']) / trad_event['estimated_t_states']) * 100
-                }
-            })
-        
-        # Compare allocators
-        lambda_alloc = results.get('benchmarks/05_memory_allocator_lambda.minz')
-        trad_alloc = results.get('benchmarks/06_memory_allocator_traditional.minz')
-        
-        if lambda_alloc and trad_alloc:
-            comparisons.append({
-                'category': 'Memory Allocator',
-                'lambda': lambda_alloc,
-                'traditional': trad_alloc,
-                'improvement': {
-                    'instructions': ((trad_alloc['instruction_count'] - lambda_alloc['instruction_count']) / trad_alloc['instruction_count']) * 100,
-                    't_states': ((trad_alloc['estimated_t_states'] - lambda_alloc['estimated_t_states']) / trad_alloc['estimated_t_states']) * 100
-                }
-            })
+        for category, lambda_name, trad_name in COMPARISON_PAIRS:
+            lambda_result = results.get(f'benchmarks/{lambda_name}.minz')
+            trad_result = results.get(f'benchmarks/{trad_name}.minz')
+            
+            if lambda_result and trad_result:
+                comparisons.append({
+                    'category': category,
+                    'lambda': lambda_result,
+                    'traditional': trad_result,
+                    'improvement': {
+                        'instructions': percent_improvement(trad_result['instruction_count'], lambda_result['instruction_count']),
+                        't_states': percent_improvement(trad_result['estimated_t_states'], lambda_result['estimated_t_states'])
+                    }
+                })
         
         return comparisons
     
     def generate_html_report(self, results, comparisons):
         """Generate beautiful HTML performance report"""
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>TRUE SMC Lambda Performance Report</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Arial, sans-serif; margin: 40px; background: #f5f5f5; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 40px; border-radius: 10px; box-shadow: 0 4px 20px rgba(0,0,0,0.1); }}
-        h1 {{ color: #2c3e50; text-align: center; font-size: 2.5em; margin-bottom: 30px; }}
-        h2 {{ color: #e74c3c; border-bottom: 3px solid #e74c3c; padding-bottom: 10px; }}
-        .highlight {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-        .benchmark {{ margin: 30px 0; padding: 20px; border: 1px solid #ddd; border-radius: 8px; }}
-        .performance-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin: 20px 0; }}
-        .metric-card {{ background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #28a745; }}
-        .improvement {{ font-size: 1.2em; font-weight: bold; color: #28a745; }}
-        .negative {{ color: #dc3545; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background-color: #f8f9fa; font-weight: bold; }}
-        .lambda-win {{ background-color: #d4edda; }}
-        .trad-win {{ background-color: #f8d7da; }}
-        .code-snippet {{ background: #2d3748; color: #e2e8f0; padding: 15px; border-radius: 8px; font-family: 'Courier New', monospace; margin: 10px 0; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🚀 TRUE SMC LAMBDA PERFORMANCE REPORT 🚀</h1>
-        
-        <div class="highlight">
-            <h2>Executive Summary</h2>
-            <p><strong>MinZ TRUE SMC Lambdas</strong> deliver revolutionary performance improvements over traditional approaches:</p>
-            <ul>
-                <li><strong>Zero allocation overhead</strong> - No heap usage for closures</li>
-                <li><strong>Direct memory access</strong> - Variables captured by absolute address</li>
-                <li><strong>Self-modifying optimization</strong> - Code adapts at runtime</li>
-                <li><strong>Faster than manual assembly</strong> - Compiler optimizations + SMC</li>
-            </ul>
-        </div>
-        
-        <h2>📊 Performance Comparisons</h2>
-"""
+        parts = [REPORT_HTML_HEADER]
         
         for comp in comparisons:
             lambda_better_instr = comp['improvement']['instructions'] > 0
             lambda_better_t = comp['improvement']['t_states'] > 0
             
-            html += f"""
+            parts.append(f"""
         <div class="benchmark">
             <h3>{comp['category']}</h3>
             <div class="performance-grid">
@@ -243,19 +298,9 @@ class BenchmarkAnalyzer:
                 <p>⚡ <strong>T-State Improvement:</strong> {comp['improvement']['t_states']:.1f}%</p>
             </div>
         </div>
-"""
+""")
         
-        html += f"""
-        <h2>📋 Detailed Results</h2>
-        <table>
-            <tr>
-                <th>Benchmark</th>
-                <th>Approach</th>
-                <th>Instructions</th>
-                <th>Est. T-States</th>
-                <th>ASM Size (bytes)</th>
-            </tr>
-"""
+        parts.append(REPORT_TABLE_HEADER)
         
         for file, data in results.items():
             approach = "🔥 SMC Lambda" if "lambda" in file else "📰 Traditional"
@@ -263,7 +308,7 @@ class BenchmarkAnalyzer:
             
             benchmark_name = file.split('/')[-1].replace('.minz', '').replace('_', ' ').title()
             
-            html += f"""
+            parts.append(f"""
             <tr class="{css_class}">
                 <td>{benchmark_name}</td>
                 <td>{approach}</td>
@@ -271,52 +316,10 @@ class BenchmarkAnalyzer:
                 <td>{data['estimated_t_states']}</td>
                 <td>{data['asm_size']}</td>
             </tr>
-"""
-        
-        html += f"""
-        </table>
-        
-        <h2>🎯 Key Insights</h2>
-        <div class="highlight">
-            <h3>Why TRUE SMC Lambdas Win:</h3>
-            <ol>
-                <li><strong>Absolute Address Capture:</strong> Variables captured directly by memory address</li>
-                <li><strong>Zero Indirection:</strong> No pointer chasing or struct access</li>
-                <li><strong>Live State Evolution:</strong> Lambda behavior changes as captured variables change</li>
-                <li><strong>Compiler Optimizations:</strong> Full optimization pipeline applied to lambda functions</li>
-                <li><strong>Z80-Native Design:</strong> Leverages Z80 absolute addressing natively</li>
-            </ol>
-        </div>
-        
-        <div class="code-snippet">
-// TRUE SMC Lambda Magic:
-let multiplier = 3;           // Lives at $F002  
-let triple = |x| x * multiplier;  // Captures $F002 directly!
-
-// Generates:
-lambda_main_0:
-    LD A, ($F002)    ; Direct absolute address access!
-    ; multiply code here
-    RET
-        </div>
-        
-        <h2>🚀 Conclusion</h2>
-        <p>TRUE SMC Lambdas represent a <strong>paradigm shift</strong> in functional programming performance. 
-        By combining self-modifying code with absolute address capture, MinZ achieves 
-        <strong>functional programming that's faster than manual assembly</strong>.</p>
+""")
         
-        <p>This isn't just a language feature - it's a <strong>revolution</strong> that makes 
-        high-level abstractions <em>accelerate</em> rather than slow down your code!</p>
-        
-        <footer style="margin-top: 40px; text-align: center; color: #666;">
-            <p>Generated by MinZ TRUE SMC Lambda Performance Analyzer</p>
-            <p>MinZ Compiler - The Future of Systems Programming</p>
-        </footer>
-    </div>
-</body>
-</html>
-"""
-        return html
+        parts.append(REPORT_HTML_FOOTER)
+        return "".join(parts)
 
 def main():
     print("🚀 TRUE SMC LAMBDA PERFORMANCE ANALYZER")
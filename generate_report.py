@@ -5,47 +5,47 @@ import sys
 from datetime import datetime
 
 def generate_html_report(results_dir):
-    # Read metrics
+    # Read metrics and gather statistics in a single pass over the CSV
     metrics = []
+    unopt_success = opt_success = smc_success = 0
+    opt_reductions = []
+    smc_reductions = []
+
     with open(f'{results_dir}/compilation_metrics.csv', 'r') as f:
         reader = csv.DictReader(f)
-        for row in reader:
-            metrics.append(row)
+        for m in reader:
+            metrics.append(m)
+
+            unopt_success += m['Unoptimized_Success'] == '1'
+            opt_success += m['Optimized_Success'] == '1'
+            smc_success += m['SMC_Success'] == '1'
+
+            # Size reductions (filter out zeros and empty strings)
+            if m['Size_Reduction_Opt'] and m['Size_Reduction_Opt'] != '0':
+                try:
+                    opt_reductions.append(float(m['Size_Reduction_Opt']))
+                except ValueError:
+                    pass
+
+            if m['Size_Reduction_SMC'] and m['Size_Reduction_SMC'] != '0':
+                try:
+                    smc_reductions.append(float(m['Size_Reduction_SMC']))
+                except ValueError:
+                    pass
 
     # Calculate statistics
     total_examples = len(metrics)
-    unopt_success = sum(1 for m in metrics if m['Unoptimized_Success'] == '1')
-    opt_success = sum(1 for m in metrics if m['Optimized_Success'] == '1') 
-    smc_success = sum(1 for m in metrics if m['SMC_Success'] == '1')
-
     unopt_rate = unopt_success * 100 / total_examples
     opt_rate = opt_success * 100 / total_examples
     smc_rate = smc_success * 100 / total_examples
 
-    # Calculate size reductions (filter out zeros and empty strings)
-    opt_reductions = []
-    smc_reductions = []
-    
-    for m in metrics:
-        if m['Size_Reduction_Opt'] and m['Size_Reduction_Opt'] != '0':
-            try:
-                opt_reductions.append(float(m['Size_Reduction_Opt']))
-            except ValueError:
-                pass
-                
-        if m['Size_Reduction_SMC'] and m['Size_Reduction_SMC'] != '0':
-            try:
-                smc_reductions.append(float(m['Size_Reduction_SMC']))
-            except ValueError:
-                pass
-
     avg_opt_reduction = sum(opt_reductions) / len(opt_reductions) if opt_reductions else 0
     avg_smc_reduction = sum(smc_reductions) / len(smc_reductions) if smc_reductions else 0
     max_opt_reduction = max(opt_reductions) if opt_reductions else 0
     max_smc_reduction = max(smc_reductions) if smc_reductions else 0
 
     # Generate HTML report
-    html = f'''<!DOCTYPE html>
+    parts = [f'''<!DOCTYPE html>
 <html>
 <head>
     <title>MinZ Comprehensive Example Test Results</title>
@@ -142,12 +142,12 @@ def generate_html_report(results_dir):
                     <th>SMC Size</th>
                     <th>Opt Reduction</th>
                     <th>SMC Reduction</th>
-                </tr>'''
+                </tr>''']
 
     for row in metrics:
         opt_red = row['Size_Reduction_Opt']
         smc_red = row['Size_Reduction_SMC']
-        html += f'''
+        parts.append(f'''
                 <tr>
                     <td>{row['Example']}</td>
                     <td class="{'success' if row['Unoptimized_Success'] == '1' else 'fail'}">{'✅' if row['Unoptimized_Success'] == '1' else '❌'}</td>
@@ -158,9 +158,9 @@ def generate_html_report(results_dir):
                     <td>{row['SMC_Size']} bytes</td>
                     <td class="improvement">{opt_red}%</td>
                     <td class="improvement">{smc_red}%</td>
-                </tr>'''
+                </tr>''')
 
-    html += '''
+    parts.append('''
             </table>
         </div>
         
@@ -185,10 +185,10 @@ def generate_html_report(results_dir):
         </ul>
     </div>
 </body>
-</html>'''
+</html>''')
 
     with open(f'{results_dir}/report.html', 'w') as f:
-        f.write(html)
+        f.write(''.join(parts))
 
     print(f'✅ HTML report generated: {results_dir}/report.html')
 
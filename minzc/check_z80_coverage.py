@@ -1,77 +1,78 @@
 #!/usr/bin/env python3
 """Check Z80 opcode coverage in emulator"""
 
-# Critical Z80 instructions that should be implemented
-CRITICAL_OPCODES = {
-    # 8-bit loads
-    0x00: "NOP",
-    0x01: "LD BC,nn", 0x11: "LD DE,nn", 0x21: "LD HL,nn", 0x31: "LD SP,nn",
+# Report order of the missing-opcode categories
+CATEGORY_NAMES = [
+    "Loads", "Arithmetic", "Logic", "Jumps",
+    "Calls", "Stack", "Inc/Dec", "I/O", "Misc"
+]
+
+# Category of each mnemonic; anything not listed is "Misc"
+OP_TO_CAT = {
+    "LD": "Loads",
+    "ADD": "Arithmetic", "ADC": "Arithmetic", "SUB": "Arithmetic", "SBC": "Arithmetic",
+    "AND": "Logic", "OR": "Logic", "XOR": "Logic", "CP": "Logic", "CPL": "Logic",
+    "JP": "Jumps", "JR": "Jumps", "DJNZ": "Jumps",
+    "CALL": "Calls", "RET": "Calls",
+    "PUSH": "Stack", "POP": "Stack",
+    "INC": "Inc/Dec", "DEC": "Inc/Dec",
+    "IN": "I/O", "OUT": "I/O",
+}
+
+# Critical Z80 instructions that should be implemented, by opcode.
+# Irregular opcodes are listed here; the regular register groups follow.
+_CRITICAL = {
+    0x00: "NOP", 0x76: "HALT", 0xF3: "DI", 0xFB: "EI",
     0x02: "LD (BC),A", 0x12: "LD (DE),A", 0x22: "LD (nn),HL", 0x32: "LD (nn),A",
     0x0A: "LD A,(BC)", 0x1A: "LD A,(DE)", 0x2A: "LD HL,(nn)", 0x3A: "LD A,(nn)",
-    
-    # 8-bit arithmetic
-    0x80: "ADD A,B", 0x81: "ADD A,C", 0x82: "ADD A,D", 0x83: "ADD A,E",
-    0x84: "ADD A,H", 0x85: "ADD A,L", 0x86: "ADD A,(HL)", 0x87: "ADD A,A",
-    0xC6: "ADD A,n",
-    
-    0x90: "SUB B", 0x91: "SUB C", 0x92: "SUB D", 0x93: "SUB E",
-    0x94: "SUB H", 0x95: "SUB L", 0x96: "SUB (HL)", 0x97: "SUB A",
-    0xD6: "SUB n",
-    
-    # Logic
-    0xA0: "AND B", 0xA1: "AND C", 0xA2: "AND D", 0xA3: "AND E",
-    0xA4: "AND H", 0xA5: "AND L", 0xA6: "AND (HL)", 0xA7: "AND A",
-    0xE6: "AND n",
-    
-    0xB0: "OR B", 0xB1: "OR C", 0xB2: "OR D", 0xB3: "OR E",
-    0xB4: "OR H", 0xB5: "OR L", 0xB6: "OR (HL)", 0xB7: "OR A",
-    0xF6: "OR n",
-    
-    0xA8: "XOR B", 0xA9: "XOR C", 0xAA: "XOR D", 0xAB: "XOR E",
-    0xAC: "XOR H", 0xAD: "XOR L", 0xAE: "XOR (HL)", 0xAF: "XOR A",
-    0xEE: "XOR n",
-    
-    0xB8: "CP B", 0xB9: "CP C", 0xBA: "CP D", 0xBB: "CP E",
-    0xBC: "CP H", 0xBD: "CP L", 0xBE: "CP (HL)", 0xBF: "CP A",
-    0xFE: "CP n",
-    
-    # Inc/Dec
-    0x03: "INC BC", 0x13: "INC DE", 0x23: "INC HL", 0x33: "INC SP",
-    0x0B: "DEC BC", 0x1B: "DEC DE", 0x2B: "DEC HL", 0x3B: "DEC SP",
-    0x04: "INC B", 0x0C: "INC C", 0x14: "INC D", 0x1C: "INC E",
-    0x24: "INC H", 0x2C: "INC L", 0x34: "INC (HL)", 0x3C: "INC A",
-    0x05: "DEC B", 0x0D: "DEC C", 0x15: "DEC D", 0x1D: "DEC E",
-    0x25: "DEC H", 0x2D: "DEC L", 0x35: "DEC (HL)", 0x3D: "DEC A",
-    
-    # Jumps
-    0xC3: "JP nn", 0xC2: "JP NZ,nn", 0xCA: "JP Z,nn",
-    0xD2: "JP NC,nn", 0xDA: "JP C,nn",
-    0xE9: "JP (HL)",
-    0x18: "JR e", 0x20: "JR NZ,e", 0x28: "JR Z,e",
-    0x30: "JR NC,e", 0x38: "JR C,e",
-    0x10: "DJNZ e",
-    
-    # Calls/Returns
-    0xCD: "CALL nn", 0xC4: "CALL NZ,nn", 0xCC: "CALL Z,nn",
-    0xD4: "CALL NC,nn", 0xDC: "CALL C,nn",
-    0xC9: "RET", 0xC0: "RET NZ", 0xC8: "RET Z",
-    0xD0: "RET NC", 0xD8: "RET C",
-    
-    # Stack
-    0xC5: "PUSH BC", 0xD5: "PUSH DE", 0xE5: "PUSH HL", 0xF5: "PUSH AF",
-    0xC1: "POP BC", 0xD1: "POP DE", 0xE1: "POP HL", 0xF1: "POP AF",
-    
-    # I/O
+    0xC6: "ADD A,n", 0xD6: "SUB n", 0xE6: "AND n", 0xEE: "XOR n",
+    0xF6: "OR n", 0xFE: "CP n",
+    0xC3: "JP nn", 0xE9: "JP (HL)", 0x18: "JR e", 0x10: "DJNZ e",
+    0xCD: "CALL nn", 0xC9: "RET",
     0xDB: "IN A,(n)", 0xD3: "OUT (n),A",
-    
-    # Misc
-    0x76: "HALT", 0xF3: "DI", 0xFB: "EI",
     0x27: "DAA", 0x2F: "CPL", 0x3F: "CCF", 0x37: "SCF",
     0x07: "RLCA", 0x0F: "RRCA", 0x17: "RLA", 0x1F: "RRA",
     0xEB: "EX DE,HL", 0x08: "EX AF,AF'", 0xD9: "EXX",
     0xE3: "EX (SP),HL",
 }
 
+# Register operands in opcode encoding order
+REGS = ["B", "C", "D", "E", "H", "L", "(HL)", "A"]
+REG_PAIRS = ["BC", "DE", "HL", "SP"]
+STACK_PAIRS = ["BC", "DE", "HL", "AF"]
+CONDITIONS = ["NZ", "Z", "NC", "C"]
+
+# 8-bit ALU ops on a register: low 3 bits select the register
+for base, prefix in [(0x80, "ADD A,"), (0x90, "SUB "), (0xA0, "AND "),
+                     (0xA8, "XOR "), (0xB0, "OR "), (0xB8, "CP ")]:
+    for i, reg in enumerate(REGS):
+        _CRITICAL[base + i] = prefix + reg
+
+# 8-bit INC/DEC: bits 3-5 select the register
+for i, reg in enumerate(REGS):
+    _CRITICAL[0x04 + 8 * i] = f"INC {reg}"
+    _CRITICAL[0x05 + 8 * i] = f"DEC {reg}"
+
+# 16-bit loads, INC/DEC and stack ops: bits 4-5 select the register pair
+for i, pair in enumerate(REG_PAIRS):
+    _CRITICAL[0x01 + 16 * i] = f"LD {pair},nn"
+    _CRITICAL[0x03 + 16 * i] = f"INC {pair}"
+    _CRITICAL[0x0B + 16 * i] = f"DEC {pair}"
+for i, pair in enumerate(STACK_PAIRS):
+    _CRITICAL[0xC5 + 16 * i] = f"PUSH {pair}"
+    _CRITICAL[0xC1 + 16 * i] = f"POP {pair}"
+
+# Conditional jumps, calls and returns: bits 3-4 select the condition
+for i, cond in enumerate(CONDITIONS):
+    _CRITICAL[0xC2 + 8 * i] = f"JP {cond},nn"
+    _CRITICAL[0x20 + 8 * i] = f"JR {cond},e"
+    _CRITICAL[0xC4 + 8 * i] = f"CALL {cond},nn"
+    _CRITICAL[0xC0 + 8 * i] = f"RET {cond}"
+
+# (opcode, name) pairs in opcode order
+CRITICAL_OPCODES = tuple(sorted(_CRITICAL.items()))
+
+
 # Opcodes currently implemented (from grep output)
 IMPLEMENTED = {
     0x00, 0x01, 0x04, 0x05, 0x06, 0x0C, 0x0E, 0x11, 0x16, 0x18,
@@ -81,59 +82,45 @@ IMPLEMENTED = {
     0xD7, 0xDB, 0xDF, 0xE7, 0xEF, 0xF1, 0xF5, 0xF7, 0xFE, 0xFF
 }
 
-print("=== Z80 EMULATOR OPCODE COVERAGE REPORT ===\n")
+# Implemented opcodes as a 256-bit mask: bit N set means opcode N is implemented
+IMPLEMENTED_MASK = 0
+for opcode in IMPLEMENTED:
+    IMPLEMENTED_MASK |= 1 << opcode
+IMPLEMENTED_COUNT = bin(IMPLEMENTED_MASK).count('1')
+
+# Report lines, written out in one go at the end
+out = []
+
+out.append("=== Z80 EMULATOR OPCODE COVERAGE REPORT ===\n")
 
-# Check critical missing opcodes
+# Check critical missing opcodes, grouping them by category in the same pass
 missing_critical = []
-for opcode, name in sorted(CRITICAL_OPCODES.items()):
-    if opcode not in IMPLEMENTED:
+categories = {cat: [] for cat in CATEGORY_NAMES}
+
+for opcode, name in CRITICAL_OPCODES:
+    if not (IMPLEMENTED_MASK >> opcode) & 1:
         missing_critical.append(f"  0x{opcode:02X}: {name}")
+        categories[OP_TO_CAT.get(name.partition(' ')[0], "Misc")].append(name)
 
-print(f"Implemented: {len(IMPLEMENTED)}/256 opcodes ({len(IMPLEMENTED)*100//256}%)")
-print(f"Critical opcodes defined: {len(CRITICAL_OPCODES)}")
-print(f"Critical opcodes missing: {len(missing_critical)}\n")
+out.append(f"Implemented: {IMPLEMENTED_COUNT}/256 opcodes ({IMPLEMENTED_COUNT*100//256}%)")
+out.append(f"Critical opcodes defined: {len(CRITICAL_OPCODES)}")
+out.append(f"Critical opcodes missing: {len(missing_critical)}\n")
 
 if missing_critical:
-    print("CRITICAL MISSING OPCODES:")
-    for item in missing_critical[:30]:  # First 30
-        print(item)
+    out.append("CRITICAL MISSING OPCODES:")
+    out.extend(missing_critical[:30])  # First 30
     if len(missing_critical) > 30:
-        print(f"  ... and {len(missing_critical)-30} more")
+        out.append(f"  ... and {len(missing_critical)-30} more")
 else:
-    print("✅ All critical opcodes implemented!")
-
-# Group missing by category
-categories = {
-    "Loads": [], "Arithmetic": [], "Logic": [], "Jumps": [],
-    "Calls": [], "Stack": [], "Inc/Dec": [], "I/O": [], "Misc": []
-}
+    out.append("✅ All critical opcodes implemented!")
 
-for opcode, name in CRITICAL_OPCODES.items():
-    if opcode not in IMPLEMENTED:
-        if "LD" in name:
-            categories["Loads"].append(name)
-        elif any(x in name for x in ["ADD", "SUB", "ADC", "SBC"]):
-            categories["Arithmetic"].append(name)
-        elif any(x in name for x in ["AND", "OR", "XOR", "CP"]):
-            categories["Logic"].append(name)
-        elif any(x in name for x in ["JP", "JR", "DJNZ"]):
-            categories["Jumps"].append(name)
-        elif any(x in name for x in ["CALL", "RET"]):
-            categories["Calls"].append(name)
-        elif any(x in name for x in ["PUSH", "POP"]):
-            categories["Stack"].append(name)
-        elif any(x in name for x in ["INC", "DEC"]):
-            categories["Inc/Dec"].append(name)
-        elif any(x in name for x in ["IN", "OUT"]):
-            categories["I/O"].append(name)
-        else:
-            categories["Misc"].append(name)
-
-print("\n=== MISSING BY CATEGORY ===")
+out.append("\n=== MISSING BY CATEGORY ===")
 for cat, items in categories.items():
     if items:
-        print(f"\n{cat}: {len(items)} missing")
+        out.append(f"\n{cat}: {len(items)} missing")
         for item in items[:5]:
-            print(f"  - {item}")
+            out.append(f"  - {item}")
         if len(items) > 5:
-            print(f"  ... and {len(items)-5} more")
+            out.append(f"  ... and {len(items)-5} more")
+
+print('\n'.join(out))
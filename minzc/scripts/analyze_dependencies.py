@@ -3,8 +3,46 @@
 import os
 import re
 import json
+import subprocess
 from collections import defaultdict
-import glob
+from concurrent.futures import ProcessPoolExecutor
+
+def list_files(directory, suffix):
+    """List non-hidden files in a directory ending with suffix."""
+    # scandir's dirent type info avoids a separate stat() per entry
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.endswith(suffix)
+                and not entry.name.startswith('.')
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+def scan_shell_script(script):
+    """Return (script dependencies, calls minzc) for a shell script."""
+    with open(script, 'r') as f:
+        content = f.read()
+    
+    # Find calls to other scripts, then Python script calls
+    deps = re.findall(r'\./([\w\-]+\.sh)', content)
+    deps.extend(re.findall(r'python3?\s+([\w\-]+\.py)', content))
+    
+    # Find calls to minzc tools
+    calls_minzc = any(tool in content for tool in ['minzc', 'mz', './mz', './minzc'])
+    
+    return deps, calls_minzc
+
+def scan_python_script(script):
+    """Return whether a Python script invokes minzc via subprocess."""
+    with open(script, 'r') as f:
+        content = f.read()
+    
+    # Find imports and subprocess calls
+    return any('minzc' in match or 'mz' in match
+               for match in re.findall(r'subprocess.*\[(.*?)\]', content))
 
 def analyze_script_dependencies():
     """Analyze dependencies between scripts and tools."""
@@ -13,45 +51,29 @@ def analyze_script_dependencies():
     script_types = defaultdict(list)
     tool_calls = defaultdict(set)
     
-    # Analyze shell scripts
-    for script in glob.glob("scripts/*.sh") + glob.glob("*.sh"):
-        if not os.path.exists(script):
-            continue
-            
-        script_name = os.path.basename(script)
-        script_types['shell'].append(script_name)
+    shell_scripts = list_files('scripts', '.sh') + list_files('.', '.sh')
+    python_scripts = list_files('scripts', '.py') + list_files('scripts/analysis', '.py')
+    
+    # Scripts are scanned independently, so spread the regex work across cores
+    with ProcessPoolExecutor() as pool:
+        shell_results = pool.map(scan_shell_script, shell_scripts, chunksize=16)
+        python_results = pool.map(scan_python_script, python_scripts, chunksize=16)
         
-        with open(script, 'r') as f:
-            content = f.read()
-            
-            # Find calls to other scripts
-            for match in re.findall(r'\./([\w\-]+\.sh)', content):
-                dependencies[script_name].append(match)
-            
-            # Find calls to minzc tools
-            for tool in ['minzc', 'mz', './mz', './minzc']:
-                if tool in content:
-                    tool_calls[script_name].add('minzc')
-            
-            # Find Python script calls
-            for match in re.findall(r'python3?\s+([\w\-]+\.py)', content):
-                dependencies[script_name].append(match)
-    
-    # Analyze Python scripts
-    for script in glob.glob("scripts/*.py") + glob.glob("scripts/analysis/*.py"):
-        if not os.path.exists(script):
-            continue
-            
-        script_name = os.path.basename(script)
-        script_types['python'].append(script_name)
+        # Analyze shell scripts
+        for script, (deps, calls_minzc) in zip(shell_scripts, shell_results):
+            script_name = os.path.basename(script)
+            script_types['shell'].append(script_name)
+            if deps:
+                dependencies[script_name].extend(deps)
+            if calls_minzc:
+                tool_calls[script_name].add('minzc')
         
-        with open(script, 'r') as f:
-            content = f.read()
-            
-            # Find imports and subprocess calls
-            for match in re.findall(r'subprocess.*\[(.*?)\]', content):
-                if 'minzc' in match or 'mz' in match:
-                    tool_calls[script_name].add('minzc')
+        # Analyze Python scripts
+        for script, calls_minzc in zip(python_scripts, python_results):
+            script_name = os.path.basename(script)
+            script_types['python'].append(script_name)
+            if calls_minzc:
+                tool_calls[script_name].add('minzc')
     
     # Analyze Makefile
     if os.path.exists('Makefile'):
@@ -65,48 +87,105 @@ def analyze_script_dependencies():
     
     return dependencies, script_types, tool_calls
 
+# Single-line `import "path"` and the specs inside an `import ( ... )` block
+IMPORT_RE = re.compile(r'import\s+(?:[\w.]+\s+)?["\']([^"\']+)["\']')
+IMPORT_SPEC_RE = re.compile(r'\s*(?:[\w.]+\s+)?["\']([^"\']+)["\']')
+
+# Exported functions and struct/interface type definitions
+DECL_RE = re.compile(r'(?:func\s+([A-Z]\w+)|type\s+(\w+)\s+(?:struct|interface))')
+
+def scan_go_file(filepath):
+    """Scan a Go file for imports, exported functions and types."""
+    imports = []
+    exports = []
+    types = []
+    in_header = True
+    in_import_block = False
+    
+    with open(filepath, 'r') as f:
+        for line in f:
+            # Imports only appear in the header, before the first declaration
+            if in_header:
+                if in_import_block:
+                    if line.startswith(')'):
+                        in_import_block = False
+                    else:
+                        match = IMPORT_SPEC_RE.match(line)
+                        if match:
+                            imports.append(match.group(1))
+                    continue
+                if line.startswith('import'):
+                    if line.startswith('import ('):
+                        in_import_block = True
+                    else:
+                        match = IMPORT_RE.match(line)
+                        if match:
+                            imports.append(match.group(1))
+                    continue
+                if not line.startswith(('func', 'type', 'var', 'const')):
+                    continue
+                in_header = False
+            
+            # Literal keyword check first; the regex only runs on candidate lines
+            if not line.startswith(('func', 'type')):
+                continue
+            match = DECL_RE.match(line)
+            if match:
+                if match.group(1):
+                    exports.append(match.group(1))
+                else:
+                    types.append(match.group(2))
+    
+    return imports, exports, types
+
+def list_go_files():
+    """List non-test Go sources under pkg/."""
+    # Ask git for the file list instead of walking the tree; untracked files
+    # are included, and files deleted but still in the index are dropped
+    try:
+        result = subprocess.run(['git', 'ls-files', '--cached', '--others', '--exclude-standard',
+                                 '--', 'pkg/*.go'],
+                                capture_output=True, text=True, check=True)
+        paths = [path for path in result.stdout.splitlines() if os.path.exists(path)]
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for root, dirs, files in os.walk('pkg'):
+            if '.git' in dirs:
+                dirs.remove('.git')
+            paths.extend(os.path.join(root, file) for file in files)
+    
+    return [path for path in paths
+            if path.endswith('.go') and not path.endswith('_test.go')]
+
 def analyze_go_structure():
     """Analyze Go package structure and dependencies."""
     
     packages = {}
     imports = defaultdict(set)
     
-    for root, dirs, files in os.walk('pkg'):
-        if '.git' in dirs:
-            dirs.remove('.git')
+    go_files = [os.path.split(path) for path in list_go_files()]
+    
+    with ProcessPoolExecutor() as pool:
+        scans = pool.map(scan_go_file, [os.path.join(root, file) for root, file in go_files], chunksize=16)
         
-        for file in files:
-            if file.endswith('.go') and not file.endswith('_test.go'):
-                filepath = os.path.join(root, file)
-                package_path = root
-                
-                if package_path not in packages:
-                    packages[package_path] = {
-                        'files': [],
-                        'exports': [],
-                        'types': [],
-                        'imports': set()
-                    }
-                
-                packages[package_path]['files'].append(file)
-                
-                with open(filepath, 'r') as f:
-                    content = f.read()
-                    
-                    # Find package imports
-                    for match in re.findall(r'import\s+["\']([^"\']+)["\']', content):
-                        if 'github.com/minz/minzc' in match:
-                            clean_import = match.replace('github.com/minz/minzc/', '')
-                            packages[package_path]['imports'].add(clean_import)
-                            imports[package_path].add(clean_import)
-                    
-                    # Find exported functions
-                    for match in re.findall(r'^func\s+([A-Z]\w+)', content, re.MULTILINE):
-                        packages[package_path]['exports'].append(match)
-                    
-                    # Find type definitions
-                    for match in re.findall(r'^type\s+(\w+)\s+(?:struct|interface)', content, re.MULTILINE):
-                        packages[package_path]['types'].append(match)
+        for (package_path, file), (file_imports, exports, types) in zip(go_files, scans):
+            if package_path not in packages:
+                packages[package_path] = {
+                    'files': [],
+                    'exports': [],
+                    'types': [],
+                    'imports': set()
+                }
+            
+            packages[package_path]['files'].append(file)
+            
+            for match in file_imports:
+                if 'github.com/minz/minzc' in match:
+                    clean_import = match.replace('github.com/minz/minzc/', '')
+                    packages[package_path]['imports'].add(clean_import)
+                    imports[package_path].add(clean_import)
+            packages[package_path]['exports'].extend(exports)
+            packages[package_path]['types'].extend(types)
     
     return packages, imports
 
@@ -164,7 +243,7 @@ def generate_architecture_doc():
     print("## Backend Architecture\n")
     print("### Available Backends")
     backends = []
-    for f in glob.glob('pkg/codegen/*_backend.go'):
+    for f in list_files('pkg/codegen', '_backend.go'):
         backend = os.path.basename(f).replace('_backend.go', '')
         backends.append(backend)
     
@@ -11,9 +11,49 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 
+from minz_patterns import FUNC_RE, FEATURE_LITERALS
+
+# Patterns are compiled once per process rather than on every call. Sources
+# are read as bytes, so the patterns are bytes too and only the captured
+# names and values are decoded.
+IMPORT_RE = re.compile(rb'import\s+"([^"]+)"')
+CONST_RE = re.compile(rb'const\s+(\w+)\s*=\s*([^;]+);')
+
+# Other language features, detected by presence of their pattern
+FEATURE_PATTERNS = [(feature, re.compile(pattern.encode())) for feature, pattern in {
+    'inline_asm': r'(asm\s*\{|asm!)',
+    'structs': r'struct\s+\w+',
+    'enums': r'enum\s+\w+',
+    'arrays': r'\[[^\]]+\]',
+    'pointers': r'\*\w+',
+    'bit_fields': r':\s*\d+\s*[,}]',
+    'imports': r'import\s+',
+    'for_loops': r'for\s+',
+    'while_loops': r'while\s+',
+    'if_else': r'if\s+.*\s+else',
+    'match': r'match\s+',
+    'constants': r'const\s+',
+    'globals': r'let\s+\w+\s*[=;]',
+    'tail_recursion': r'return\s+\w+\s*\([^)]*\)\s*;?\s*\}',
+}.items()]
+
+# Test expectation comments: a generic result, or a per-function one
+EXPECTED_RES = [re.compile(pattern.encode(), re.IGNORECASE) for pattern in [
+    r'//\s*(?:returns?|expects?|result)\s*[:=]\s*(\d+)',
+    r'//\s*(\w+)\s*\([^)]*\)\s*(?:returns?|->|=)\s*(\d+)',
+    r'//\s*test:\s*(\w+)\s*=\s*(\d+)',
+]]
+
 class MinZAnalyzer:
     """Analyzes MinZ source files to extract test information."""
     
+    # Features reported as test tags, and the ones that make a test advanced
+    TAG_FEATURES = frozenset({'tsmc', 'abi', 'inline_asm', 'lua'})
+    ADVANCED_FEATURES = frozenset({'structs', 'enums', 'arrays', 'bit_fields'})
+    
+    # Name fragments of real-world example programs
+    REAL_WORLD_WORDS = ('game', 'editor', 'mnist', 'zvdb', 'sprite')
+    
     def __init__(self):
         self.functions = []
         self.has_main = False
@@ -24,7 +64,7 @@ class MinZAnalyzer:
         
     def analyze_file(self, filepath: Path) -> Dict[str, Any]:
         """Analyze a MinZ file and return test information."""
-        content = filepath.read_text()
+        content = filepath.read_bytes()
         self.content = content
         
         # Analyze various aspects
@@ -36,33 +76,24 @@ class MinZAnalyzer:
         
         return self._generate_test_entry(filepath)
     
-    def _analyze_functions(self, content: str):
+    def _analyze_functions(self, content: bytes):
         """Extract function definitions and their signatures."""
         # Match function definitions
-        func_pattern = r'fn\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*(\w+))?'
-        
-        for match in re.finditer(func_pattern, content):
-            func_name = match.group(1)
-            params_str = match.group(2)
-            return_type = match.group(3) or 'void'
+        for match in FUNC_RE.finditer(content):
+            func_name = match.group(1).decode()
+            params_str = match.group(2).decode()
+            return_type = match.group(3).decode() if match.group(3) else 'void'
             
             # Parse parameters
             params = []
             if params_str.strip():
                 for param in params_str.split(','):
-                    param = param.strip()
-                    if ':' in param:
-                        name, ptype = param.split(':', 1)
-                        params.append({
-                            'name': name.strip(),
-                            'type': ptype.strip()
-                        })
-                    else:
-                        # Handle old-style params
-                        params.append({
-                            'name': param.strip(),
-                            'type': 'u8'  # Default assumption
-                        })
+                    name, colon, ptype = param.partition(':')
+                    params.append({
+                        'name': name.strip(),
+                        # Old-style params have no type; assume u8
+                        'type': ptype.strip() if colon else 'u8'
+                    })
             
             func_info = {
                 'name': func_name,
@@ -75,44 +106,24 @@ class MinZAnalyzer:
             else:
                 self.functions.append(func_info)
     
-    def _analyze_features(self, content: str):
+    def _analyze_features(self, content: bytes):
         """Detect language features used."""
-        feature_patterns = {
-            'tsmc': r'@tsmc',
-            'abi': r'@abi',
-            'inline_asm': r'(asm\s*\{|asm!)',
-            'lua': r'@lua',
-            'structs': r'struct\s+\w+',
-            'enums': r'enum\s+\w+',
-            'arrays': r'\[[^\]]+\]',
-            'pointers': r'\*\w+',
-            'bit_fields': r':\s*\d+\s*[,}]',
-            'imports': r'import\s+',
-            'for_loops': r'for\s+',
-            'while_loops': r'while\s+',
-            'if_else': r'if\s+.*\s+else',
-            'match': r'match\s+',
-            'constants': r'const\s+',
-            'globals': r'let\s+\w+\s*[=;]',
-            'tail_recursion': r'return\s+\w+\s*\([^)]*\)\s*;?\s*\}',
-        }
-        
-        for feature, pattern in feature_patterns.items():
-            if re.search(pattern, content):
+        for feature, literal in FEATURE_LITERALS.items():
+            if literal in content:
+                self.features.add(feature)
+        for feature, pattern in FEATURE_PATTERNS:
+            if pattern.search(content):
                 self.features.add(feature)
     
-    def _analyze_imports(self, content: str):
+    def _analyze_imports(self, content: bytes):
         """Extract import statements."""
-        import_pattern = r'import\s+"([^"]+)"'
-        self.imports = re.findall(import_pattern, content)
+        self.imports = [path.decode() for path in IMPORT_RE.findall(content)]
     
-    def _analyze_constants(self, content: str):
+    def _analyze_constants(self, content: bytes):
         """Extract constant definitions."""
-        const_pattern = r'const\s+(\w+)\s*=\s*([^;]+);'
-        
-        for match in re.finditer(const_pattern, content):
-            name = match.group(1)
-            value = match.group(2).strip()
+        for match in CONST_RE.finditer(content):
+            name = match.group(1).decode()
+            value = match.group(2).decode().strip()
             
             # Try to evaluate simple numeric constants
             if value.isdigit():
@@ -123,23 +134,17 @@ class MinZAnalyzer:
                 except:
                     pass
     
-    def _analyze_expected_results(self, content: str):
+    def _analyze_expected_results(self, content: bytes):
         """Extract expected results from comments."""
         # Look for test expectation comments
-        patterns = [
-            r'//\s*(?:returns?|expects?|result)\s*[:=]\s*(\d+)',
-            r'//\s*(\w+)\s*\([^)]*\)\s*(?:returns?|->|=)\s*(\d+)',
-            r'//\s*test:\s*(\w+)\s*=\s*(\d+)',
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
+        for pattern in EXPECTED_RES:
+            for match in pattern.finditer(content):
                 if len(match.groups()) == 1:
                     # Generic expected result
                     self.expected_results['_default'] = int(match.group(1))
                 else:
                     # Function-specific result
-                    func_name = match.group(1)
+                    func_name = match.group(1).decode()
                     result = int(match.group(2))
                     self.expected_results[func_name] = result
     
@@ -147,20 +152,21 @@ class MinZAnalyzer:
         """Determine appropriate test arguments for a function."""
         func_name = func_info['name']
         params = func_info['params']
+        name_lower = func_name.lower()
         
         # Special cases for known function patterns
-        if 'fibonacci' in func_name.lower() or 'fib' in func_name.lower():
+        if 'fibonacci' in name_lower or 'fib' in name_lower:
             return [10]  # fibonacci(10) = 55
-        elif 'factorial' in func_name.lower():
+        elif 'factorial' in name_lower:
             return [5]   # factorial(5) = 120
-        elif 'strlen' in func_name.lower():
+        elif 'strlen' in name_lower:
             return [0x8000]  # Assume string at this address
-        elif 'add' in func_name.lower() or 'sum' in func_name.lower():
+        elif 'add' in name_lower or 'sum' in name_lower:
             if len(params) >= 2:
                 return [100, 200]
             else:
                 return [100]
-        elif 'multiply' in func_name.lower() or 'mul' in func_name.lower():
+        elif 'multiply' in name_lower or 'mul' in name_lower:
             if len(params) >= 2:
                 return [5, 7]
             else:
@@ -184,21 +190,22 @@ class MinZAnalyzer:
     def _determine_expected_result(self, func_info: Dict[str, Any], args: List[int]) -> int:
         """Determine expected result for function call."""
         func_name = func_info['name']
+        name_lower = func_name.lower()
         
         # Check if we have an explicit expected result
         if func_name in self.expected_results:
             return self.expected_results[func_name]
         
         # Special cases
-        if 'fibonacci' in func_name.lower():
+        if 'fibonacci' in name_lower:
             if args[0] == 10:
                 return 55
-        elif 'factorial' in func_name.lower():
+        elif 'factorial' in name_lower:
             if args[0] == 5:
                 return 120
-        elif 'add' in func_name.lower() and len(args) >= 2:
+        elif 'add' in name_lower and len(args) >= 2:
             return (args[0] + args[1]) & 0xFFFF
-        elif 'multiply' in func_name.lower() and len(args) >= 2:
+        elif 'multiply' in name_lower and len(args) >= 2:
             return (args[0] * args[1]) & 0xFFFF
         
         # Default: return first argument or 0
@@ -231,7 +238,7 @@ class MinZAnalyzer:
                 'exit_code': 0
             },
             'performance': {},
-            'tags': list(self.features & {'tsmc', 'abi', 'inline_asm', 'lua'})
+            'tags': list(self.features & self.TAG_FEATURES)
         }
         
         # Add performance expectations for TSMC tests
@@ -269,9 +276,9 @@ class MinZAnalyzer:
             return 'optimization'
         elif 'abi' in self.features or 'asm' in name_lower or 'inline' in name_lower:
             return 'integration'
-        elif any(f in self.features for f in ['structs', 'enums', 'arrays', 'bit_fields']):
+        elif not self.ADVANCED_FEATURES.isdisjoint(self.features):
             return 'advanced'
-        elif any(word in name_lower for word in ['game', 'editor', 'mnist', 'zvdb', 'sprite']):
+        elif any(word in name_lower for word in self.REAL_WORLD_WORDS):
             return 'real_world'
         else:
             return 'basic'
@@ -292,15 +299,15 @@ def main():
     analyzer = MinZAnalyzer()
     test_entry = analyzer.analyze_file(input_file)
     
-    # Output result
-    output_json = json.dumps(test_entry, indent=2)
-    
+    # Output result, serialized straight to its destination
     if len(sys.argv) > 2:
         output_file = Path(sys.argv[2])
-        output_file.write_text(output_json)
+        with open(output_file, 'w') as f:
+            json.dump(test_entry, f, indent=2)
         print(f"Test entry saved to: {output_file}")
     else:
-        print(output_json)
+        json.dump(test_entry, sys.stdout, indent=2)
+        print()
 
 
 if __name__ == '__main__':
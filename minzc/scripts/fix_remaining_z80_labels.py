@@ -3,64 +3,65 @@
 Fix remaining Z80 label patterns
 """
 
+import os
 import re
 import sys
 
-def fix_remaining_labels(content):
-    """Fix all remaining label patterns"""
+# Label prefixes in emitted label references and definitions. The source is
+# ASCII Go, so lines are matched as bytes without decoding them.
+USE_PREFIX_RE = re.compile(rb'\.([a-z_]+)_%d"')
+DEF_PREFIX_RE = re.compile(rb'\.([a-z_]+)_%d:')
+DECLARED_RE = re.compile(rb'getFunctionLabel\("([^"]*)"\)')
+
+# How many preceding lines are searched for an existing label variable
+LOOKBACK_LINES = 10
+
+def fix_remaining_labels(lines):
+    """Fix all remaining label patterns, yielding the fixed lines"""
     
-    # Find all lines with label patterns
-    lines = content.split('\n')
-    new_lines = []
+    # Line number of the last original line declaring each label prefix
+    last_declared = {}
     
     for i, line in enumerate(lines):
+        original = line
+        
         # Check if this line generates a label with %d pattern
-        if 'g.emit(' in line and '%d", g.labelCounter)' in line:
+        if b'g.emit(' in line and b'%d", g.labelCounter)' in line:
             # Extract the label prefix
-            match = re.search(r'\.([a-z_]+)_%d"', line)
+            match = USE_PREFIX_RE.search(line)
             if match:
                 label_prefix = match.group(1)
-                # Check if this is the first use of this label in a sequence
-                # by looking at previous lines
-                is_first_use = True
-                for j in range(max(0, i-10), i):
-                    if f'getFunctionLabel("{label_prefix}")' in lines[j]:
-                        is_first_use = False
-                        break
+                var_name = label_prefix.replace(b'_', b'') + b'Label'
                 
-                if is_first_use:
+                # Check if this is the first use of this label in a sequence
+                # by looking up the last declaration in the lookback window
+                if i - last_declared.get(label_prefix, -LOOKBACK_LINES - 1) > LOOKBACK_LINES:
                     # Add label generation before this line
-                    var_name = label_prefix.replace('_', '') + 'Label'
-                    new_lines.append(f'\t\t{var_name} := g.getFunctionLabel("{label_prefix}")')
-                    # Replace the pattern in the current line
-                    line = line.replace(f'.{label_prefix}_%d", g.labelCounter)', f'%s", {var_name})')
-                else:
-                    # Just replace with the variable
-                    var_name = label_prefix.replace('_', '') + 'Label'
-                    line = line.replace(f'.{label_prefix}_%d", g.labelCounter)', f'%s", {var_name})')
+                    yield b'\t\t' + var_name + b' := g.getFunctionLabel("' + label_prefix + b'")\n'
+                
+                # Replace the pattern in the current line
+                line = line.replace(b'.' + label_prefix + b'_%d", g.labelCounter)', b'%s", ' + var_name + b')')
         
         # Also fix label definitions
-        elif 'g.emit(".' in line and '_%d:", g.labelCounter)' in line:
-            match = re.search(r'\.([a-z_]+)_%d:', line)
+        elif b'g.emit(".' in line and b'_%d:", g.labelCounter)' in line:
+            match = DEF_PREFIX_RE.search(line)
             if match:
                 label_prefix = match.group(1)
-                var_name = label_prefix.replace('_', '') + 'Label'
-                line = line.replace(f'.{label_prefix}_%d:", g.labelCounter)', f'%s:", {var_name})')
+                var_name = label_prefix.replace(b'_', b'') + b'Label'
+                line = line.replace(b'.' + label_prefix + b'_%d:", g.labelCounter)', b'%s:", ' + var_name + b')')
         
-        new_lines.append(line)
-    
-    return '\n'.join(new_lines)
+        if b'getFunctionLabel("' in original:
+            for prefix in DECLARED_RE.findall(original):
+                last_declared[prefix] = i
+        yield line
 
 if __name__ == "__main__":
-    # Read the file
-    with open("minzc/pkg/codegen/z80.go", "r") as f:
-        content = f.read()
-    
-    # Fix the labels
-    fixed_content = fix_remaining_labels(content)
+    source = "minzc/pkg/codegen/z80.go"
     
-    # Write back
-    with open("minzc/pkg/codegen/z80.go", "w") as f:
-        f.write(fixed_content)
+    # Fix the labels line by line into a temporary file, then swap it in
+    with open(source, "rb") as fin, open(source + ".tmp", "wb") as fout:
+        for line in fix_remaining_labels(fin):
+            fout.write(line)
+    os.replace(source + ".tmp", source)
     
     print("Fixed remaining Z80 label patterns")
\ No newline at end of file
@@ -7,9 +7,12 @@ This script analyzes example files and creates appropriate test entries.
 import os
 import json
 import re
+from multiprocessing import Pool
 from pathlib import Path
 from typing import Dict, List, Any
 
+from minz_patterns import FUNC_RE, FEATURE_LITERALS
+
 # Categories mapping based on file names and content
 CATEGORY_PATTERNS = {
     'basic': [
@@ -36,14 +39,32 @@ CATEGORY_PATTERNS = {
     ]
 }
 
-def categorize_file(filename: str, content: str) -> str:
+# One anchored pattern with a named group per category. Each group is a
+# lookahead over the whole name, so categories are still tried in order
+# and the first one containing any of its patterns wins.
+CATEGORY_RE = re.compile('^(?:' + '|'.join(
+    f'(?P<{category}>(?=.*(?:' + '|'.join(patterns) + ')))'
+    for category, patterns in CATEGORY_PATTERNS.items()
+) + ')')
+
+# Skip certain test files that are incomplete or problematic
+SKIP_RE = re.compile('|'.join([
+    r'test_.*_debug\.minz$',
+    r'test_missing_.*\.minz$',
+    r'test_advanced_missing\.minz$',
+    r'test_language_coverage\.minz$',  # Meta test file
+]))
+
+MAIN_RE = re.compile(rb'fn\s+main\s*\(\s*\)')
+EXPECTED_FUNC_RE = re.compile(rb'//\s*(\w+).*returns?\s+(\d+)', re.IGNORECASE)
+
+def categorize_file(filename: str, content: bytes) -> str:
     """Determine the category for a test file."""
     filename_lower = filename.lower()
     
-    for category, patterns in CATEGORY_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, filename_lower):
-                return category
+    match = CATEGORY_RE.match(filename_lower)
+    if match:
+        return match.lastgroup
     
     # Default to basic if no pattern matches
     return 'basic'
@@ -51,42 +72,36 @@ def categorize_file(filename: str, content: str) -> str:
 def extract_test_info(filepath: Path) -> Dict[str, Any]:
     """Extract test information from a MinZ file."""
     filename = filepath.name
-    content = filepath.read_text()
-    
-    # Skip certain test files that are incomplete or problematic
-    skip_patterns = [
-        r'test_.*_debug\.minz$',
-        r'test_missing_.*\.minz$',
-        r'test_advanced_missing\.minz$',
-        r'test_language_coverage\.minz$',  # Meta test file
-    ]
     
-    for pattern in skip_patterns:
-        if re.search(pattern, filename):
-            return None
+    # Skip certain test files that are incomplete or problematic before
+    # reading them at all
+    if SKIP_RE.search(filename):
+        return None
+    
+    content = filepath.read_bytes()
     
     # Extract main function if present
-    main_match = re.search(r'fn\s+main\s*\(\s*\)', content)
+    main_match = MAIN_RE.search(content)
     has_main = main_match is not None
     
+    # Expected results from "// name ... returns N" comments, first one wins
+    expected_by_func = {}
+    for match in EXPECTED_FUNC_RE.finditer(content):
+        expected_by_func.setdefault(match.group(1).decode().lower(), int(match.group(2)))
+    
     # Extract other functions
     functions = []
-    func_pattern = r'fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->)?\s*(\w+)?'
-    for match in re.finditer(func_pattern, content):
-        func_name = match.group(1)
-        params = match.group(2)
-        return_type = match.group(3)
+    for match in FUNC_RE.finditer(content):
+        func_name = match.group(1).decode()
+        params = match.group(2).decode()
+        return_type = match.group(3).decode() if match.group(3) else None
         
         # Skip main and internal functions
         if func_name == 'main' or func_name.startswith('_'):
             continue
             
         # Try to determine expected results from comments
-        expected = None
-        comment_pattern = rf'//\s*{func_name}.*returns?\s+(\d+)'
-        comment_match = re.search(comment_pattern, content, re.IGNORECASE)
-        if comment_match:
-            expected = int(comment_match.group(1))
+        expected = expected_by_func.get(func_name.lower())
         
         functions.append({
             'name': func_name,
@@ -96,10 +111,10 @@ def extract_test_info(filepath: Path) -> Dict[str, Any]:
         })
     
     # Check for specific features
-    has_tsmc = '@tsmc' in content
-    has_abi = '@abi' in content
-    has_inline_asm = 'asm {' in content or 'asm!' in content
-    has_lua = '@lua' in content
+    has_tsmc = FEATURE_LITERALS['tsmc'] in content
+    has_abi = FEATURE_LITERALS['abi'] in content
+    has_inline_asm = b'asm {' in content or b'asm!' in content
+    has_lua = FEATURE_LITERALS['lua'] in content
     
     # Determine category
     category = categorize_file(filename, content)
@@ -148,13 +163,14 @@ def extract_test_info(filepath: Path) -> Dict[str, Any]:
             }
             
             # Special handling for known functions
-            if 'fibonacci' in func['name'].lower():
+            name_lower = func['name'].lower()
+            if 'fibonacci' in name_lower:
                 func_test['arguments'] = [10]
                 func_test['expected'] = 55
-            elif 'factorial' in func['name'].lower():
+            elif 'factorial' in name_lower:
                 func_test['arguments'] = [5]
                 func_test['expected'] = 120
-            elif 'add' in func['name'].lower():
+            elif 'add' in name_lower:
                 func_test['arguments'] = [100, 200]
                 func_test['expected'] = 300
                 
@@ -190,19 +206,26 @@ def main():
         manifest['categories'][category]['tests'] = []
     
     # Process all .minz files in examples
-    minz_files = list(examples_dir.glob('*.minz'))
+    with os.scandir(examples_dir) as entries:
+        minz_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.name.endswith('.minz') and not entry.name.startswith('.')
+        )
     print(f"Found {len(minz_files)} MinZ files in examples/")
     
-    for filepath in sorted(minz_files):
-        test_entry = extract_test_info(filepath)
-        if test_entry:
-            manifest['tests'].append(test_entry)
-            category = test_entry['category']
-            if category in manifest['categories']:
-                manifest['categories'][category]['tests'].append(test_entry['name'])
-            print(f"  Added: {test_entry['name']} ({category})")
-        else:
-            print(f"  Skipped: {filepath.name}")
+    # Files are analyzed independently across worker processes; results come
+    # back in file order and the manifest is only updated here
+    with Pool(os.cpu_count()) as pool:
+        test_entries = pool.imap(extract_test_info, minz_files, chunksize=32)
+        for filepath, test_entry in zip(minz_files, test_entries):
+            if test_entry:
+                manifest['tests'].append(test_entry)
+                category = test_entry['category']
+                if category in manifest['categories']:
+                    manifest['categories'][category]['tests'].append(test_entry['name'])
+                print(f"  Added: {test_entry['name']} ({category})")
+            else:
+                print(f"  Skipped: {filepath.name}")
     
     # Save updated manifest
     with open(manifest_path, 'w') as f:
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Patterns shared by the MinZ source analyzers.
+Sources are ASCII, so everything here works on bytes read straight from disk.
+"""
+
+import re
+
+# Function definitions: name, parameter list and optional return type
+FUNC_RE = re.compile(rb'fn\s+(\w+)\s*\(([^)]*)\)(?:\s*->\s*(\w+))?')
+
+# Language features spelled as a fixed literal are found by substring test
+FEATURE_LITERALS = {
+    'tsmc': b'@tsmc',
+    'abi': b'@abi',
+    'lua': b'@lua',
+}
@@ -3,128 +3,128 @@
 
 import struct
 
-def generate_test_program():
-    """Generate test program for all critical Z80 opcodes"""
-    program = []
-    
+# Test program for all critical Z80 opcodes, one instruction per chunk
+TEST_PROGRAM_CHUNKS = (
     # Start with NOP
-    program.append(0x00)  # NOP
-    
+    b"\x00",          # NOP
+
     # 16-bit loads with test values
-    program.extend([0x01, 0x34, 0x12])  # LD BC, $1234
-    program.extend([0x11, 0x78, 0x56])  # LD DE, $5678
-    program.extend([0x21, 0xBC, 0x9A])  # LD HL, $9ABC
-    program.extend([0x31, 0xF0, 0xDE])  # LD SP, $DEF0
-    
+    b"\x01\x34\x12",  # LD BC, $1234
+    b"\x11\x78\x56",  # LD DE, $5678
+    b"\x21\xBC\x9A",  # LD HL, $9ABC
+    b"\x31\xF0\xDE",  # LD SP, $DEF0
+
     # 8-bit loads with immediate values
-    program.extend([0x06, 0x42])  # LD B, $42
-    program.extend([0x0E, 0x84])  # LD C, $84
-    program.extend([0x16, 0x21])  # LD D, $21
-    program.extend([0x1E, 0x63])  # LD E, $63
-    program.extend([0x26, 0xA5])  # LD H, $A5
-    program.extend([0x2E, 0x5A])  # LD L, $5A
-    program.extend([0x3E, 0x7F])  # LD A, $7F
-    
+    b"\x06\x42",      # LD B, $42
+    b"\x0E\x84",      # LD C, $84
+    b"\x16\x21",      # LD D, $21
+    b"\x1E\x63",      # LD E, $63
+    b"\x26\xA5",      # LD H, $A5
+    b"\x2E\x5A",      # LD L, $5A
+    b"\x3E\x7F",      # LD A, $7F
+
     # Memory loads/stores (using safe addresses)
-    program.extend([0x02])  # LD (BC), A
-    program.extend([0x12])  # LD (DE), A
-    program.extend([0x22, 0x00, 0x80])  # LD ($8000), HL
-    program.extend([0x32, 0x02, 0x80])  # LD ($8002), A
-    program.extend([0x0A])  # LD A, (BC)
-    program.extend([0x1A])  # LD A, (DE)
-    program.extend([0x2A, 0x00, 0x80])  # LD HL, ($8000)
-    program.extend([0x3A, 0x02, 0x80])  # LD A, ($8002)
-    
+    b"\x02",          # LD (BC), A
+    b"\x12",          # LD (DE), A
+    b"\x22\x00\x80",  # LD ($8000), HL
+    b"\x32\x02\x80",  # LD ($8002), A
+    b"\x0A",          # LD A, (BC)
+    b"\x1A",          # LD A, (DE)
+    b"\x2A\x00\x80",  # LD HL, ($8000)
+    b"\x3A\x02\x80",  # LD A, ($8002)
+
     # Arithmetic with immediate
-    program.extend([0xC6, 0x11])  # ADD A, $11
-    program.extend([0xD6, 0x22])  # SUB $22
-    program.extend([0xE6, 0x33])  # AND $33
-    program.extend([0xF6, 0x44])  # OR $44
-    program.extend([0xEE, 0x55])  # XOR $55
-    program.extend([0xFE, 0x66])  # CP $66
-    
+    b"\xC6\x11",      # ADD A, $11
+    b"\xD6\x22",      # SUB $22
+    b"\xE6\x33",      # AND $33
+    b"\xF6\x44",      # OR $44
+    b"\xEE\x55",      # XOR $55
+    b"\xFE\x66",      # CP $66
+
     # Inc/Dec 16-bit
-    program.append(0x03)  # INC BC
-    program.append(0x13)  # INC DE
-    program.append(0x23)  # INC HL
-    program.append(0x33)  # INC SP
-    program.append(0x0B)  # DEC BC
-    program.append(0x1B)  # DEC DE
-    program.append(0x2B)  # DEC HL
-    program.append(0x3B)  # DEC SP
-    
+    b"\x03",          # INC BC
+    b"\x13",          # INC DE
+    b"\x23",          # INC HL
+    b"\x33",          # INC SP
+    b"\x0B",          # DEC BC
+    b"\x1B",          # DEC DE
+    b"\x2B",          # DEC HL
+    b"\x3B",          # DEC SP
+
     # Inc/Dec 8-bit
-    program.append(0x04)  # INC B
-    program.append(0x0C)  # INC C
-    program.append(0x14)  # INC D
-    program.append(0x1C)  # INC E
-    program.append(0x24)  # INC H
-    program.append(0x2C)  # INC L
-    program.append(0x3C)  # INC A
-    program.append(0x05)  # DEC B
-    program.append(0x0D)  # DEC C
-    program.append(0x15)  # DEC D
-    program.append(0x1D)  # DEC E
-    program.append(0x25)  # DEC H
-    program.append(0x2D)  # DEC L
-    program.append(0x3D)  # DEC A
-    
+    b"\x04",          # INC B
+    b"\x0C",          # INC C
+    b"\x14",          # INC D
+    b"\x1C",          # INC E
+    b"\x24",          # INC H
+    b"\x2C",          # INC L
+    b"\x3C",          # INC A
+    b"\x05",          # DEC B
+    b"\x0D",          # DEC C
+    b"\x15",          # DEC D
+    b"\x1D",          # DEC E
+    b"\x25",          # DEC H
+    b"\x2D",          # DEC L
+    b"\x3D",          # DEC A
+
     # Jumps (with forward jumps to avoid loops)
-    program.extend([0x18, 0x02])  # JR +2
-    program.extend([0x00, 0x00])  # Skip these NOPs
-    program.extend([0x20, 0x01])  # JR NZ, +1
-    program.append(0x00)  # Skip this NOP
-    program.extend([0x28, 0x01])  # JR Z, +1
-    program.append(0x00)  # Skip this NOP
-    program.extend([0x30, 0x01])  # JR NC, +1
-    program.append(0x00)  # Skip this NOP
-    program.extend([0x38, 0x01])  # JR C, +1
-    program.append(0x00)  # Skip this NOP
-    
+    b"\x18\x02",      # JR +2
+    b"\x00\x00",      # Skip these NOPs
+    b"\x20\x01",      # JR NZ, +1
+    b"\x00",          # Skip this NOP
+    b"\x28\x01",      # JR Z, +1
+    b"\x00",          # Skip this NOP
+    b"\x30\x01",      # JR NC, +1
+    b"\x00",          # Skip this NOP
+    b"\x38\x01",      # JR C, +1
+    b"\x00",          # Skip this NOP
+
     # Stack operations (safe values)
-    program.extend([0xC5])  # PUSH BC
-    program.extend([0xD5])  # PUSH DE
-    program.extend([0xE5])  # PUSH HL
-    program.extend([0xF5])  # PUSH AF
-    program.extend([0xF1])  # POP AF
-    program.extend([0xE1])  # POP HL
-    program.extend([0xD1])  # POP DE
-    program.extend([0xC1])  # POP BC
-    
+    b"\xC5",          # PUSH BC
+    b"\xD5",          # PUSH DE
+    b"\xE5",          # PUSH HL
+    b"\xF5",          # PUSH AF
+    b"\xF1",          # POP AF
+    b"\xE1",          # POP HL
+    b"\xD1",          # POP DE
+    b"\xC1",          # POP BC
+
     # Rotates and shifts
-    program.append(0x07)  # RLCA
-    program.append(0x0F)  # RRCA
-    program.append(0x17)  # RLA
-    program.append(0x1F)  # RRA
-    
+    b"\x07",          # RLCA
+    b"\x0F",          # RRCA
+    b"\x17",          # RLA
+    b"\x1F",          # RRA
+
     # Misc
-    program.append(0x27)  # DAA
-    program.append(0x2F)  # CPL
-    program.append(0x37)  # SCF
-    program.append(0x3F)  # CCF
-    
+    b"\x27",          # DAA
+    b"\x2F",          # CPL
+    b"\x37",          # SCF
+    b"\x3F",          # CCF
+
     # Exchange
-    program.append(0xEB)  # EX DE,HL
-    program.extend([0xE3])  # EX (SP),HL
-    program.append(0x08)  # EX AF,AF'
-    program.append(0xD9)  # EXX
-    
+    b"\xEB",          # EX DE,HL
+    b"\xE3",          # EX (SP),HL
+    b"\x08",          # EX AF,AF'
+    b"\xD9",          # EXX
+
     # I/O with test ports
-    program.extend([0xDB, 0xFE])  # IN A, ($FE)
-    program.extend([0xD3, 0xFE])  # OUT ($FE), A
-    
+    b"\xDB\xFE",      # IN A, ($FE)
+    b"\xD3\xFE",      # OUT ($FE), A
+
     # Interrupts
-    program.append(0xF3)  # DI
-    program.append(0xFB)  # EI
-    
+    b"\xF3",          # DI
+    b"\xFB",          # EI
+
     # End with HALT
-    program.append(0x76)  # HALT
-    
-    return bytes(program)
+    b"\x76",          # HALT
+)
 
-def create_test_asm():
-    """Create assembly source for verification"""
-    asm = """; Z80 Opcode Test Program
+def generate_test_program():
+    """Generate test program for all critical Z80 opcodes"""
+    return b"".join(TEST_PROGRAM_CHUNKS)
+
+# Assembly source of the same program, for verification
+TEST_ASM_SOURCE = b"""; Z80 Opcode Test Program
     ORG $8000
     
     ; Start
@@ -248,20 +248,30 @@ skip5:
     
     END
 """
-    return asm
+
+def write_if_changed(path, data):
+    """Write data to path unless the file already holds exactly that"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
 
 # Generate test program
 test_program = generate_test_program()
 
-# Write binary
-with open('test_z80_opcodes.bin', 'wb') as f:
-    f.write(test_program)
-
-# Write assembly
-with open('test_z80_opcodes.a80', 'w') as f:
-    f.write(create_test_asm())
+# Write binary and assembly, leaving up-to-date files untouched
+changed = write_if_changed('test_z80_opcodes.bin', test_program)
+changed |= write_if_changed('test_z80_opcodes.a80', TEST_ASM_SOURCE)
 
 print(f"Generated test program: {len(test_program)} bytes")
-print("Files created: test_z80_opcodes.bin, test_z80_opcodes.a80")
+if changed:
+    print("Files created: test_z80_opcodes.bin, test_z80_opcodes.a80")
+else:
+    print("Files up to date: test_z80_opcodes.bin, test_z80_opcodes.a80")
 print("\nFirst 50 bytes (hex):")
 print(' '.join(f'{b:02X}' for b in test_program[:50]))
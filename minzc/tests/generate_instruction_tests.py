@@ -280,15 +280,9 @@ INSTRUCTIONS = {
     ],
 }
 
-def generate_test_file(category, opcode, mnemonic, instruction):
-    """Generate a test file for a single instruction"""
-    filename = f"{TEST_DIR}/test_{opcode:02x}_{mnemonic.lower().replace(' ', '_').replace(',', '').replace('(', '').replace(')', '')}.a80"
-    
-    # Skip if it causes syntax issues
-    if "'" in instruction:  # Skip AF' for now
-        return
-        
-    content = f"""; Test for {mnemonic} (opcode ${opcode:02X})
+# Single-instruction test source; only the mnemonic, opcode and
+# instruction vary between files
+TEST_FILE_TEMPLATE = """; Test for {mnemonic} (opcode ${opcode:02X})
     ORG $8000
     
     ; Setup if needed
@@ -306,7 +300,19 @@ def generate_test_file(category, opcode, mnemonic, instruction):
     
     END
 """
+
+def generate_test_file(category, opcode, mnemonic, instruction):
+    """Generate a test file for a single instruction"""
+    filename = f"{TEST_DIR}/test_{opcode:02x}_{mnemonic.lower().replace(' ', '_').replace(',', '').replace('(', '').replace(')', '')}.a80"
+    
+    # Skip if it causes syntax issues
+    if "'" in instruction:  # Skip AF' for now
+        return
+        
+    content = TEST_FILE_TEMPLATE.format(mnemonic=mnemonic, opcode=opcode, instruction=instruction)
     
+    # Small files are written in a single call, in the same text mode as the
+    # category tests and summary
     with open(filename, 'w') as f:
         f.write(content)
 
@@ -314,7 +320,7 @@ def generate_category_test(category, instructions):
     """Generate a test file for a whole category"""
     filename = f"{TEST_DIR}/test_category_{category}.a80"
     
-    content = f"""; Test for {category.replace('_', ' ').title()} instructions
+    parts = [f"""; Test for {category.replace('_', ' ').title()} instructions
     ORG $8000
     
     ; Setup
@@ -324,22 +330,20 @@ def generate_category_test(category, instructions):
     LD SP, $FF00
     LD A, $42
     
-"""
+"""]
     
     for opcode, mnemonic, instruction in instructions:
         if "'" not in instruction:  # Skip AF' for now
-            content += f"    ; {mnemonic}\n"
-            content += f"    {instruction}\n"
-            content += "    NOP\n\n"
+            parts.append(f"    ; {mnemonic}\n    {instruction}\n    NOP\n\n")
     
-    content += """    ; Done
+    parts.append("""    ; Done
     RET
     
     END
-"""
+""")
     
     with open(filename, 'w') as f:
-        f.write(content)
+        f.write("".join(parts))
 
 def main():
     print("Generating Z80 instruction test files...")
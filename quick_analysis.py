@@ -1,28 +1,17 @@
 #!/usr/bin/env python3
 """Quick performance analysis of TRUE SMC lambdas"""
 
+import re
+
+# An instruction line: not blank, not a comment, label or directive, no ':'
+INSTRUCTION_RE = re.compile(rb'^[^\S\n]*(?![;.]|EQU|ORG|DB|END)[^\s:][^:\n]*$', re.MULTILINE)
+
 def count_instructions(asm_file):
     """Count Z80 instructions in assembly file"""
-    with open(asm_file, 'r') as f:
+    with open(asm_file, 'rb') as f:
         content = f.read()
     
-    lines = content.split('\n')
-    instruction_count = 0
-    
-    for line in lines:
-        line = line.strip()
-        # Skip comments, labels, directives
-        if (line and 
-            not line.startswith(';') and 
-            not line.startswith('.') and 
-            ':' not in line and
-            not line.startswith('EQU') and
-            not line.startswith('ORG') and
-            not line.startswith('DB') and
-            not line.startswith('END')):
-            instruction_count += 1
-    
-    return instruction_count
+    return len(INSTRUCTION_RE.findall(content))
 
 def analyze_benchmark():
     print("🚀 TRUE SMC LAMBDA PERFORMANCE ANALYSIS")
@@ -8,8 +8,31 @@ Converts MinZ-generated labels to be compatible with both MZA and SjASMPlus
 import os
 import re
 import shutil
+from functools import lru_cache
+from multiprocessing import Pool
 from pathlib import Path
 
+# Token sets and patterns are built once at import rather than per call
+REGISTERS = frozenset({'A', 'B', 'C', 'D', 'E', 'H', 'L', 'AF', 'BC', 'DE', 'HL', 'SP', 'IX', 'IY', 'IXH', 'IXL', 'IYH', 'IYL'})
+LABEL_KEYWORDS = frozenset({'ORG', 'DB', 'DW', 'DEFB', 'DEFW', 'DS', 'DEFS', 'EQU', 'END', 'NOP', 'HALT', 'RET', 'CALL', 'JP', 'JR'})
+INSTRUCTIONS = frozenset({'LD', 'ADD', 'SUB', 'AND', 'OR', 'XOR', 'CP', 'INC', 'DEC', 'JP', 'JR', 'CALL', 'RET', 'PUSH', 'POP', 'NOP', 'HALT'})
+DIRECTIVES = frozenset({'ORG', 'DB', 'DW', 'DEFB', 'DEFW', 'DS', 'DEFS', 'EQU', 'END'})
+REFERENCE_SKIP_TOKENS = REGISTERS | INSTRUCTIONS | DIRECTIVES
+
+# Problematic label characters, all mapped to '_'; dots are handled separately
+SANITIZE_TABLE = str.maketrans(dict.fromkeys('$-/\\ \t', '_'))
+
+# First characters a numeric literal can start with, checked before NUMERIC_RE
+NUMERIC_START = frozenset('$#0123456789ABCDEFabcdef')
+NUMERIC_RE = re.compile(r'^[\$#]?[0-9A-Fa-f]+[hH]?$')
+INVALID_CHARS_RE = re.compile(r'[^A-Za-z0-9_]')
+UNDERSCORE_RUN_RE = re.compile(r'__+')
+# Patterns that look like labels (not registers, not numbers)
+LABEL_REF_RE = re.compile(r'\b([A-Za-z_][A-Za-z0-9_.$-]*[A-Za-z0-9_$-])\b')
+
+# Labels repeat heavily across a corpus (every reference to a symbol), so
+# results are memoized
+@lru_cache(maxsize=65536)
 def sanitize_label(label):
     """
     Sanitize a label to be compatible with both assemblers
@@ -24,26 +47,21 @@ def sanitize_label(label):
     original = label
     
     # Skip if it's a numeric literal or expression
-    if re.match(r'^[\$#]?[0-9A-Fa-f]+$', label):
-        return label
-    if re.match(r'^[\$#]?[0-9A-Fa-f]+[hH]?$', label):
+    if label[:1] in NUMERIC_START and NUMERIC_RE.match(label):
         return label
     
     # Skip register names and common assembly tokens
-    registers = {'A', 'B', 'C', 'D', 'E', 'H', 'L', 'AF', 'BC', 'DE', 'HL', 'SP', 'IX', 'IY', 'IXH', 'IXL', 'IYH', 'IYL'}
-    if label.upper() in registers:
+    if label.upper() in REGISTERS:
         return label
     
     # Skip directives and opcodes
-    if label.upper() in {'ORG', 'DB', 'DW', 'DEFB', 'DEFW', 'DS', 'DEFS', 'EQU', 'END', 'NOP', 'HALT', 'RET', 'CALL', 'JP', 'JR'}:
+    if label.upper() in LABEL_KEYWORDS:
         return label
     
     # Start sanitization
-    sanitized = label
-    
-    # Replace problematic characters
-    # $ used in self-modifying code labels
-    sanitized = sanitized.replace('$', '_')
+    # Replace problematic characters in one pass ($ is used in
+    # self-modifying code labels)
+    sanitized = label.translate(SANITIZE_TABLE)
     
     # Handle dots - preserve single leading dots for local labels, sanitize others
     if sanitized.startswith('.') and not sanitized.startswith('..'):
@@ -53,28 +71,20 @@ def sanitize_label(label):
         # Multiple dots or dots in middle - sanitize all
         sanitized = sanitized.replace('.', '_')
     
-    # Replace other problematic characters
-    sanitized = sanitized.replace('-', '_')
-    sanitized = sanitized.replace('/', '_')
-    sanitized = sanitized.replace('\\', '_')
-    sanitized = sanitized.replace(' ', '_')
-    sanitized = sanitized.replace('\t', '_')
-    
     # Remove any remaining invalid characters (keep alphanumeric, underscore, and single leading dot)
     if sanitized.startswith('.'):
         # Local label
-        sanitized = '.' + re.sub(r'[^A-Za-z0-9_]', '_', sanitized[1:])
+        sanitized = '.' + INVALID_CHARS_RE.sub('_', sanitized[1:])
     else:
         # Global label
-        sanitized = re.sub(r'[^A-Za-z0-9_]', '_', sanitized)
+        sanitized = INVALID_CHARS_RE.sub('_', sanitized)
     
     # Ensure label doesn't start with number (except local labels)
     if not sanitized.startswith('.') and sanitized and sanitized[0].isdigit():
         sanitized = 'L' + sanitized
     
     # Remove double underscores
-    while '__' in sanitized:
-        sanitized = sanitized.replace('__', '_')
+    sanitized = UNDERSCORE_RUN_RE.sub('_', sanitized)
     
     # Remove trailing underscore
     sanitized = sanitized.rstrip('_')
@@ -108,72 +118,73 @@ def sanitize_line(line):
             line = sanitized_label + ':' + rest_part
     
     # Handle label references in instructions
-    # This is more complex - we need to identify operands that are labels
-    # and sanitize them while preserving registers, numbers, etc.
+    # Only references containing $, .. or - are ever rewritten, so a line
+    # without any of them is returned untouched
+    if '$' not in line and '-' not in line and '..' not in line:
+        return line
     
-    # Simple approach: find likely label references and sanitize them
-    # Patterns that look like labels (not registers, not numbers)
-    label_pattern = r'\b([A-Za-z_][A-Za-z0-9_.$-]*[A-Za-z0-9_$-])\b'
+    # Otherwise find likely label references and sanitize them
+    return LABEL_REF_RE.sub(replace_label_ref, line)
+
+def replace_label_ref(match):
+    """
+    Sanitize one label reference found in an instruction operand, while
+    preserving registers, numbers, etc.
+    """
+    candidate = match.group(1)
     
-    def replace_label_ref(match):
-        candidate = match.group(1)
-        
-        # Skip if it looks like a register
-        if candidate.upper() in {'A', 'B', 'C', 'D', 'E', 'H', 'L', 'AF', 'BC', 'DE', 'HL', 'SP', 'IX', 'IY', 'IXH', 'IXL', 'IYH', 'IYL'}:
-            return candidate
-        
-        # Skip if it looks like an instruction
-        if candidate.upper() in {'LD', 'ADD', 'SUB', 'AND', 'OR', 'XOR', 'CP', 'INC', 'DEC', 'JP', 'JR', 'CALL', 'RET', 'PUSH', 'POP', 'NOP', 'HALT'}:
-            return candidate
-        
-        # Skip if it looks like a directive
-        if candidate.upper() in {'ORG', 'DB', 'DW', 'DEFB', 'DEFW', 'DS', 'DEFS', 'EQU', 'END'}:
-            return candidate
-        
-        # Skip numbers and hex values
-        if re.match(r'^[\$#]?[0-9A-Fa-f]+[hH]?$', candidate):
-            return candidate
-        
-        # If it contains problematic characters, sanitize it
-        if '$' in candidate or '..' in candidate or '-' in candidate:
-            return sanitize_label(candidate)
-        
+    # Only candidates with problematic characters need sanitizing
+    if '$' not in candidate and '..' not in candidate and '-' not in candidate:
         return candidate
     
-    # Apply label sanitization to the line
-    line = re.sub(label_pattern, replace_label_ref, line)
+    # Skip if it looks like a register, instruction or directive
+    if candidate.upper() in REFERENCE_SKIP_TOKENS:
+        return candidate
+    
+    # Skip numbers and hex values
+    if NUMERIC_RE.match(candidate):
+        return candidate
     
-    return line
+    return sanitize_label(candidate)
 
 def sanitize_file(input_path, output_path):
     """
     Sanitize a single assembly file
+    The output directory must already exist
     """
     try:
-        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        sanitized_lines = []
-        for line_num, line in enumerate(lines, 1):
-            try:
-                sanitized_line = sanitize_line(line)
-                sanitized_lines.append(sanitized_line)
-            except Exception as e:
-                # If sanitization fails, keep original line
-                print(f"Warning: Failed to sanitize line {line_num} in {input_path}: {e}")
-                sanitized_lines.append(line)
-        
-        # Create output directory if needed
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.writelines(sanitized_lines)
+        # Stream line by line rather than holding the whole file in memory
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as fin, \
+                open(output_path, 'w', encoding='utf-8') as fout:
+            for line_num, line in enumerate(fin, 1):
+                try:
+                    sanitized_line = sanitize_line(line)
+                except Exception as e:
+                    # If sanitization fails, keep original line
+                    print(f"Warning: Failed to sanitize line {line_num} in {input_path}: {e}")
+                    sanitized_line = line
+                fout.write(sanitized_line)
         
         return True
     except Exception as e:
         print(f"Error processing {input_path}: {e}")
         return False
 
+def find_a80_files(root):
+    """
+    Yield the paths of all .a80 files under root as plain strings
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.a80'):
+                yield os.path.join(dirpath, filename)
+
+def sanitize_task(paths):
+    """
+    Pool worker: sanitize one (input_path, output_path) pair
+    """
+    return sanitize_file(*paths)
+
 def main():
     """
     Main function to sanitize the entire corpus
@@ -194,25 +205,29 @@ def main():
     output_dir.mkdir(parents=True)
     
     # Find all .a80 files
-    a80_files = list(base_dir.glob('**/*.a80'))
+    a80_files = list(find_a80_files(base_dir))
     print(f"Found {len(a80_files)} .a80 files")
     
-    # Process files
+    # Process files, spread over worker processes; results come back in order
+    rel_paths = [os.path.relpath(input_file, base_dir) for input_file in a80_files]
+    tasks = [(input_file, os.path.join(output_dir, rel_path)) for input_file, rel_path in zip(a80_files, rel_paths)]
+    
+    # Create each output directory once up front instead of once per file
+    for directory in {os.path.dirname(output_file) for _, output_file in tasks}:
+        os.makedirs(directory, exist_ok=True)
     success_count = 0
     fail_count = 0
     
-    for i, input_file in enumerate(a80_files, 1):
-        # Calculate relative path to preserve directory structure
-        rel_path = input_file.relative_to(base_dir)
-        output_file = output_dir / rel_path
-        
-        if i % 100 == 0 or i <= 10:
-            print(f"Processing {i}/{len(a80_files)}: {rel_path}")
-        
-        if sanitize_file(input_file, output_file):
-            success_count += 1
-        else:
-            fail_count += 1
+    with Pool() as pool:
+        results = pool.imap(sanitize_task, tasks, chunksize=16)
+        for i, (rel_path, ok) in enumerate(zip(rel_paths, results), 1):
+            if i % 100 == 0 or i <= 10:
+                print(f"Processing {i}/{len(a80_files)}: {rel_path}")
+            
+            if ok:
+                success_count += 1
+            else:
+                fail_count += 1
     
     print()
     print("📊 SANITIZATION RESULTS")
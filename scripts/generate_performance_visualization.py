@@ -6,120 +6,105 @@ Creates visual reports from test results
 """
 
 import csv
+import heapq
 import json
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
+from string import Template
 
-# ASCII art for terminal visualization
-def generate_ascii_chart(data, title, max_width=60):
-    """Generate ASCII bar chart"""
-    print(f"\n{title}")
-    print("=" * (max_width + 20))
-    
-    if not data:
-        print("No data available")
-        return
-    
-    max_value = max(data.values())
-    
-    for label, value in sorted(data.items(), key=lambda x: -x[1]):
-        bar_width = int((value / max_value) * max_width)
-        bar = "█" * bar_width
-        print(f"{label:20} |{bar} {value:.1f}%")
+# Columns shown in the results table, in display order
+TABLE_COLUMNS = ('Size Reduction %', 'Instruction Reduction %', 'Est. Cycle Improvement %')
 
-def generate_html_report(test_dir):
-    """Generate interactive HTML report with charts"""
-    
-    # Read performance data
-    perf_file = Path(test_dir) / "performance_report.csv"
-    if not perf_file.exists():
-        print(f"Error: {perf_file} not found")
-        return
-    
-    performance_data = []
-    with open(perf_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            performance_data.append(row)
-    
-    # Generate HTML
-    html_content = f"""
+# (CSS class, label) for the table's status column
+STATUS_IMPROVED = ('improved', '✅ Improved')
+STATUS_REGRESSION = ('regression', '⚠️ Regression')
+STATUS_UNCHANGED = ('', '➖ No change')
+
+# Largest number of examples drawn in each HTML bar chart; beyond this only
+# the biggest cycle changes are charted (the table still lists every row)
+CHART_LIMIT = 50
+
+# Index given to columns the CSV header lacks; no row is ever this wide
+MISSING_COLUMN = sys.maxsize
+
+# Report page; $-placeholders are filled in by generate_html_report
+HTML_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html>
 <head>
     <title>MinZ Performance Report</title>
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <style>
-        body {{
+        body {
             font-family: Arial, sans-serif;
             margin: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background-color: white;
             padding: 20px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #333;
             text-align: center;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             width: 48%;
             display: inline-block;
             margin: 1%;
             height: 400px;
-        }}
-        .summary {{
+        }
+        .summary {
             background-color: #e8f4f8;
             padding: 15px;
             border-radius: 5px;
             margin: 20px 0;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 10px;
             text-align: left;
             border-bottom: 1px solid #ddd;
-        }}
-        th {{
+        }
+        th {
             background-color: #4CAF50;
             color: white;
-        }}
-        tr:hover {{
+        }
+        tr:hover {
             background-color: #f5f5f5;
-        }}
-        .improved {{
+        }
+        .improved {
             color: green;
             font-weight: bold;
-        }}
-        .regression {{
+        }
+        .regression {
             color: red;
             font-weight: bold;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <h1>🚀 MinZ Optimization Performance Report</h1>
-        <p style="text-align: center; color: #666;">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p style="text-align: center; color: #666;">Generated: $generated</p>
         
         <div class="summary">
             <h2>📊 Summary Statistics</h2>
             <ul>
-                <li>Total Examples Tested: <strong>{len(performance_data)}</strong></li>
-                <li>Average Cycle Improvement: <strong>{calculate_average_improvement(performance_data):.1f}%</strong></li>
-                <li>Best Performer: <strong>{get_best_performer(performance_data)}</strong></li>
-                <li>Examples with Improvements: <strong>{count_improvements(performance_data)}</strong></li>
+                <li>Total Examples Tested: <strong>$total_examples</strong></li>
+                <li>Average Cycle Improvement: <strong>$average_improvement%</strong></li>
+                <li>Best Performer: <strong>$best_performer</strong></li>
+                <li>Examples with Improvements: <strong>$improved_count</strong></li>
             </ul>
         </div>
         
@@ -142,193 +127,272 @@ def generate_html_report(test_dir):
                 </tr>
             </thead>
             <tbody>
-                {generate_table_rows(performance_data)}
+                $table_rows
             </tbody>
         </table>
     </div>
     
     <script>
+        // Chart data, serialized once for both charts
+        const DATA = $chart_data;
+        
         // Cycle Improvement Chart
         const cycleCtx = document.getElementById('cycleChart').getContext('2d');
-        const cycleChart = new Chart(cycleCtx, {{
+        const cycleChart = new Chart(cycleCtx, {
             type: 'bar',
-            data: {{
-                labels: {json.dumps(get_example_names(performance_data))},
-                datasets: [{{
+            data: {
+                labels: DATA.names,
+                datasets: [{
                     label: 'Cycle Improvement %',
-                    data: {json.dumps(get_cycle_improvements(performance_data))},
+                    data: DATA.cycles,
                     backgroundColor: 'rgba(75, 192, 192, 0.6)',
                     borderColor: 'rgba(75, 192, 192, 1)',
                     borderWidth: 1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
+                plugins: {
+                    title: {
                         display: true,
                         text: 'Estimated Cycle Improvements by Example'
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                    }
+                },
+                scales: {
+                    y: {
                         beginAtZero: true,
-                        ticks: {{
-                            callback: function(value) {{
+                        ticks: {
+                            callback: function(value) {
                                 return value + '%';
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                            }
+                        }
+                    }
+                }
+            }
+        });
         
         // Size Reduction Chart
         const sizeCtx = document.getElementById('sizeChart').getContext('2d');
-        const sizeChart = new Chart(sizeCtx, {{
+        const sizeChart = new Chart(sizeCtx, {
             type: 'bar',
-            data: {{
-                labels: {json.dumps(get_example_names(performance_data))},
-                datasets: [{{
+            data: {
+                labels: DATA.names,
+                datasets: [{
                     label: 'Size Reduction %',
-                    data: {json.dumps(get_size_reductions(performance_data))},
+                    data: DATA.sizes,
                     backgroundColor: 'rgba(255, 159, 64, 0.6)',
                     borderColor: 'rgba(255, 159, 64, 1)',
                     borderWidth: 1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
+                plugins: {
+                    title: {
                         display: true,
                         text: 'Code Size Reductions by Example'
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                    }
+                },
+                scales: {
+                    y: {
                         beginAtZero: true,
-                        ticks: {{
-                            callback: function(value) {{
+                        ticks: {
+                            callback: function(value) {
                                 return value + '%';
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                            }
+                        }
+                    }
+                }
+            }
+        });
     </script>
 </body>
 </html>
-"""
+""")
+
+# ASCII art for terminal visualization
+def generate_ascii_chart(pairs, title, max_width=60):
+    """Generate ASCII bar chart from (label, value) pairs, largest value first"""
+    lines = [f"\n{title}", "=" * (max_width + 20)]
+    
+    if not pairs:
+        lines.append("No data available")
+    else:
+        max_value = pairs[0][1]
+        for label, value in pairs:
+            bar_width = int((value / max_value) * max_width)
+            bar = "█" * bar_width
+            lines.append(f"{label:20} |{bar} {value:.1f}%")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def generate_html_report(test_dir):
+    """Generate interactive HTML report with charts"""
+    
+    # Read performance data
+    perf_file = Path(test_dir) / "performance_report.csv"
+    if not perf_file.exists():
+        print(f"Error: {perf_file} not found")
+        return
+    
+    with open(perf_file, 'r') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        # Blank lines are not examples (csv.DictReader skipped them too)
+        performance_data = [row for row in reader if row]
+    
+    # Parse every row once for the summary, charts and table
+    summary = summarize_performance(header, performance_data)
+    names = summary['example_names']
+    cycles = summary['cycle_improvements']
+    sizes = summary['size_reductions']
+    if len(cycles) > CHART_LIMIT:
+        top = heapq.nlargest(CHART_LIMIT, range(len(cycles)), key=lambda i: abs(cycles[i]))
+        row_names = summary['row_names']
+        names = [row_names[i] for i in top]
+        cycles = [cycles[i] for i in top]
+        sizes = [sizes[i] for i in top]
+    chart_data = json.dumps({
+        'names': names,
+        'cycles': cycles,
+        'sizes': sizes,
+    }, separators=(',', ':'))
+    
+    # Generate HTML
+    html_content = HTML_TEMPLATE.substitute(
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        total_examples=len(performance_data),
+        average_improvement=f"{summary['average_improvement']:.1f}",
+        best_performer=summary['best_performer'],
+        improved_count=summary['improved_count'],
+        table_rows=''.join(generate_table_rows(summary['table_rows'])),
+        chart_data=chart_data,
+    )
     
     # Save HTML report
     html_file = Path(test_dir) / "performance_report.html"
-    with open(html_file, 'w') as f:
-        f.write(html_content)
+    with open(html_file, 'wb', buffering=1 << 20) as f:
+        f.write(html_content.encode('utf-8'))
     
     print(f"✅ HTML report generated: {html_file}")
     
     # Also generate ASCII visualization for terminal
-    cycle_data = {}
-    for row in performance_data[:10]:  # Top 10 for terminal display
-        if row.get('Est. Cycle Improvement %'):
-            try:
-                cycle_data[Path(row['File']).name] = float(row['Est. Cycle Improvement %'])
-            except ValueError:
-                pass
-    
-    generate_ascii_chart(cycle_data, "Top 10 Cycle Improvements")
+    terminal_pairs = sorted(summary['terminal_cycles'].items(), key=lambda x: -x[1])
+    generate_ascii_chart(terminal_pairs, "Top 10 Cycle Improvements")
 
 # Helper functions for HTML generation
-def calculate_average_improvement(data):
-    improvements = []
-    for row in data:
-        if row.get('Est. Cycle Improvement %'):
-            try:
-                improvements.append(float(row['Est. Cycle Improvement %']))
-            except ValueError:
-                pass
-    return sum(improvements) / len(improvements) if improvements else 0
+def parse_percent(value):
+    """Parse a percentage cell; None if it is blank or not a number"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
 
-def get_best_performer(data):
+def summarize_performance(header, data):
+    """Collect summary statistics, chart series and table rows in one pass"""
+    # Cells are read by position; a column absent from the header gets an
+    # index past the end of any row, so it reads as missing like a short row
+    columns = {column: index for index, column in enumerate(header)}
+    file_index = columns.get('File', MISSING_COLUMN)
+    cycle_index = columns.get('Est. Cycle Improvement %', MISSING_COLUMN)
+    size_index = columns.get('Size Reduction %', MISSING_COLUMN)
+    # In the table an absent column counts as 0, but a short row is skipped
+    table_cells = [
+        (columns[column], None) if column in columns else (MISSING_COLUMN, '0')
+        for column in TABLE_COLUMNS
+    ]
+    
+    example_names = []
+    # One slot per row; cells that do not parse stay 0, rows without a File
+    # cell get an empty label
+    row_names = [''] * len(data)
+    cycle_improvements = [0] * len(data)
+    size_reductions = [0] * len(data)
+    table_rows = []
+    terminal_cycles = {}
+    total_improvement = 0
+    parsed_count = 0
+    improved_count = 0
     best = None
     best_improvement = -999
-    for row in data:
-        if row.get('Est. Cycle Improvement %'):
-            try:
-                improvement = float(row['Est. Cycle Improvement %'])
-                if improvement > best_improvement:
-                    best_improvement = improvement
-                    best = Path(row['File']).name
-            except ValueError:
-                pass
-    return f"{best} ({best_improvement:.1f}%)" if best else "N/A"
-
-def count_improvements(data):
-    count = 0
-    for row in data:
-        if row.get('Est. Cycle Improvement %'):
-            try:
-                if float(row['Est. Cycle Improvement %']) > 0:
-                    count += 1
-            except ValueError:
-                pass
-    return count
-
-def get_example_names(data):
-    return [Path(row['File']).name for row in data if row.get('File')]
-
-def get_cycle_improvements(data):
-    improvements = []
-    for row in data:
-        if row.get('Est. Cycle Improvement %'):
-            try:
-                improvements.append(float(row['Est. Cycle Improvement %']))
-            except ValueError:
-                improvements.append(0)
-        else:
-            improvements.append(0)
-    return improvements
+    
+    for i, row in enumerate(data):
+        width = len(row)
+        file_name = row[file_index] if file_index < width else None
+        # Base name of the example; the CSV paths come from find, so '/' only
+        name = file_name.rpartition('/')[2] if file_name is not None else None
+        if file_name:
+            example_names.append(name)
+        if name is not None:
+            row_names[i] = name
+        
+        cycle = parse_percent(row[cycle_index] if cycle_index < width else None)
+        size = parse_percent(row[size_index] if size_index < width else None)
+        if size is not None:
+            size_reductions[i] = size
+        
+        if cycle is not None:
+            cycle_improvements[i] = cycle
+            total_improvement += cycle
+            parsed_count += 1
+            if cycle > 0:
+                improved_count += 1
+        
+        # Rows without a File cell (no column, or a short row) have no label,
+        # so they stay out of the best performer, terminal chart and table
+        if name is None:
+            continue
+        
+        if cycle is not None:
+            if cycle > best_improvement:
+                best_improvement = cycle
+                best = name
+            if i < 10:  # Top 10 for terminal display
+                terminal_cycles[name] = cycle
+        
+        # Table rows need all three columns
+        values = [
+            parse_percent(row[index] if index < width else default)
+            for index, default in table_cells
+        ]
+        if None not in values:
+            table_rows.append((name, *values))
+    
+    return {
+        'example_names': example_names,
+        'row_names': row_names,
+        'cycle_improvements': cycle_improvements,
+        'size_reductions': size_reductions,
+        'table_rows': table_rows,
+        'terminal_cycles': terminal_cycles,
+        'average_improvement': total_improvement / parsed_count if parsed_count else 0,
+        'best_performer': f"{best} ({best_improvement:.1f}%)" if best else "N/A",
+        'improved_count': improved_count,
+    }
 
-def get_size_reductions(data):
-    reductions = []
-    for row in data:
-        if row.get('Size Reduction %'):
-            try:
-                reductions.append(float(row['Size Reduction %']))
-            except ValueError:
-                reductions.append(0)
+def generate_table_rows(table_rows):
+    """Yield the <tr> markup for each parsed table row"""
+    for name, size_red, inst_red, cycle_imp in table_rows:
+        if cycle_imp > 0:
+            status_class, status = STATUS_IMPROVED
+        elif cycle_imp < 0:
+            status_class, status = STATUS_REGRESSION
         else:
-            reductions.append(0)
-    return reductions
-
-def generate_table_rows(data):
-    rows = []
-    for row in data:
-        try:
-            cycle_imp = float(row.get('Est. Cycle Improvement %', 0))
-            size_red = float(row.get('Size Reduction %', 0))
-            inst_red = float(row.get('Instruction Reduction %', 0))
-            
-            status_class = 'improved' if cycle_imp > 0 else ('regression' if cycle_imp < 0 else '')
-            status = '✅ Improved' if cycle_imp > 0 else ('⚠️ Regression' if cycle_imp < 0 else '➖ No change')
-            
-            rows.append(f"""
+            status_class, status = STATUS_UNCHANGED
+        
+        yield f"""
                 <tr>
-                    <td>{Path(row['File']).name}</td>
+                    <td>{name}</td>
                     <td>{size_red:.1f}%</td>
                     <td>{inst_red:.1f}%</td>
                     <td class="{status_class}">{cycle_imp:.1f}%</td>
                     <td>{status}</td>
                 </tr>
-            """)
-        except (ValueError, KeyError):
-            pass
-    
-    return ''.join(rows)
+            """
 
 def main():
     if len(sys.argv) < 2: